@@ -1,27 +1,19 @@
-import os
-os.environ["CUDA_VISIBLE_DEVICES"] = ""
-os.environ["OMP_NUM_THREADS"] = "4"
+from ocr.cpu_tuning import configure_cpu_env
+configure_cpu_env()
 
 import streamlit as st
 import tempfile
-import numpy as np
-from PIL import Image
-import pypdfium2 as pdfium
-from ocr.ocr_engine import ocr_on_image
-from verification.final_verification import verify_document
+import hashlib
+import time
+import uuid
+from ocr.ocr_engine import get_reader, COLD_START
+from ocr.model_registry import get_registry
+from ocr.profiles import PROFILES, default_profile_name
+from ocr.scheduler import SchedulerBusy
+from pipeline import JobManager, describe_progress
 from utils.pdf_report import generate_pdf
 
 
-# ---------------- PDF → IMAGE (STREAMLIT SAFE) ----------------
-def pdf_to_images(pdf_bytes):
-    pdf = pdfium.PdfDocument(pdf_bytes)
-    pages = []
-    for page in pdf:
-        pil_image = page.render(scale=3).to_pil()
-        pages.append(pil_image)
-    return pages
-
-
 # ---------------- PAGE CONFIG ----------------
 st.set_page_config(
     page_title="AI Govt-ID Verification System",
@@ -104,17 +96,121 @@ st.markdown('<h3 class="glow-subheading">AI-Powered OCR-Based Government Documen
 st.markdown("<div class='card'>", unsafe_allow_html=True)
 uploaded_files = st.file_uploader(
     "📤 Upload Aadhaar / PAN Image or PDF",
-    type=["png", "jpg", "jpeg", "pdf"],
+    type=["png", "jpg", "jpeg", "pdf", "tif", "tiff"],
     accept_multiple_files=True
 )
 st.markdown("</div>", unsafe_allow_html=True)
 
+debug_mode = st.checkbox("🐞 Show raw OCR debug output", value=False)
+
+# speed / accuracy trade-off for this session's uploads (see ocr/profiles.py)
+profile_names = list(PROFILES)
+profile = st.selectbox(
+    "⚙️ Processing profile",
+    profile_names,
+    index=profile_names.index(default_profile_name()),
+    help="fast: fewer passes, ID fast path · accurate: every pass, stricter checks"
+)
+
+# Load (and warm up) the model on page load, not on the first upload,
+# so the first-run spinner is visible in the page
+ocr_backend = get_reader()
+if debug_mode:
+    st.caption(f"OCR cold start: {COLD_START}")
+    if hasattr(ocr_backend, "memo"):
+        st.caption(f"Recognition memo: {ocr_backend.memo.stats()}")
+    st.caption(f"Extra-script readers: {get_registry().stats()}")
+
+# ---------------- RESULT CACHE (PER UPLOAD) ----------------
+# Streamlit re-runs this script on every widget interaction, so uploads
+# are identified by their content hash and handed to a process-wide job
+# registry. Only files that were not seen before trigger any work.
+def upload_digest(file):
+    digests = st.session_state.setdefault("upload_digests", {})
+    key = (getattr(file, "file_id", None), file.name, file.size)
+    if key not in digests:
+        digests[key] = hashlib.sha256(file.getvalue()).hexdigest()
+    return digests[key]
+
+
+# ---------------- BACKGROUND PROCESSING ----------------
+@st.cache_resource(show_spinner=False)
+def get_job_manager():
+    return JobManager()
+
+
+def render_page(file, i, page, paged):
+    text = page["text"]
+    confidence = page["confidence"]
+
+    card = page.get("card")
+    if card:
+        where = f" · Page {page['page'] + 1}" if paged else ""
+        st.markdown(f"### 🪪 Card {card} of {page['card_count']}{where}")
+    elif paged:
+        st.markdown(f"### 📄 Page {i+1}")
+
+    if debug_mode:
+        st.write("🔎 RAW OCR RESULT:")
+        st.write(page["raw"])
+        st.write("OCR TEXT LENGTH:", len(text))
+        st.write("OCR CONFIDENCE:", confidence)
+
+    st.markdown("<div class='card'>", unsafe_allow_html=True)
+    st.markdown("**📄 OCR Extracted Text**")
+
+    if paged or card:
+        st.text_area("", text, height=150, key=f"pdf_text_{file.name}_{i}")
+        st.markdown(f"**OCR Confidence:** {confidence}%")
+    else:
+        st.text_area("", text, height=150, key=f"img_text_{file.name}")
+        color = "🟢" if confidence >= 80 else "🟡"
+        st.markdown(f"{color} **OCR Confidence:** {confidence}%")
+
+    st.progress(confidence / 100)
+    st.markdown("</div>", unsafe_allow_html=True)
+
+
 all_text = ""
 final_report = {}
 
 # ---------------- PROCESS FILES ----------------
 if uploaded_files:
+    manager = get_job_manager()
+    session_id = st.session_state.setdefault("session_id", uuid.uuid4().hex)
+
+    # Uploads the scheduler turned away ("busy") or the user stopped
+    # ("cancelled") are not resubmitted on every rerun (that would turn
+    # backpressure into polling); the user retries them explicitly
+    held = st.session_state.setdefault("held_uploads", {})
+
+    # Submit everything first so files are processed concurrently
+    jobs = []
     for file in uploaded_files:
+        is_pdf = file.name.lower().endswith(".pdf")
+        # PDFs and (multi-page) TIFF scans are shown page by page
+        paged = is_pdf or file.name.lower().endswith((".tif", ".tiff"))
+        key = (upload_digest(file), file.name, profile)
+        job = None
+        if key not in held:
+            try:
+                job = manager.submit(
+                    key, file.name, file.getvalue(), is_pdf, session_id, profile
+                )
+            except SchedulerBusy:
+                held[key] = "busy"
+        jobs.append((file, paged, key, job))
+
+    # Files removed from the uploader (or submitted under another profile)
+    # stop instead of running on until they look abandoned
+    active = {key for _, _, key, job in jobs if job is not None}
+    for key in st.session_state.get("active_jobs", set()) - active:
+        manager.cancel(key, session_id)
+    st.session_state["active_jobs"] = active
+
+    pending = False
+
+    for file, paged, key, job in jobs:
 
         st.markdown(
             f"""
@@ -125,87 +221,36 @@ if uploaded_files:
             unsafe_allow_html=True
         )
 
-        # ========== PDF HANDLING ==========
-        if file.name.lower().endswith(".pdf"):
-            pages = pdf_to_images(file.read())
-
-            for i, page in enumerate(pages):
-                st.markdown(f"### 📄 Page {i+1}")
-
-                # PIL → NumPy (NO cv2)
-                img = np.array(page.convert("RGB"))
-
-                progress = st.progress(0)
-                status = st.empty()
-
-                status.info("🔍 Preprocessing document...")
-                progress.progress(30)
-
-                status.info("🧠 Running OCR engine...")
-                progress.progress(65)
-
-                result = ocr_on_image(img)
-
-                st.write("🔎 RAW OCR RESULT (PDF):")
-                st.write(result)
-
-                text = result["final"]["text"]
-                confidence = result["final"]["confidence"]
-
-                # 🔎 TEMP DEBUG (STEP 3)
-                st.write("OCR TEXT LENGTH:", len(text))
-                st.write("OCR CONFIDENCE:", confidence)
-
-                st.markdown("<div class='card'>", unsafe_allow_html=True)
-                st.markdown("**📄 OCR Extracted Text**")
-                st.text_area("", text, height=150, key=f"pdf_text_{file.name}_{i}")
-                st.markdown(f"**OCR Confidence:** {confidence}%")
-                st.progress(confidence / 100)
-                st.markdown("</div>", unsafe_allow_html=True)
-
-                report = verify_document(text, confidence, file.name)
-                final_report.update(report)
-                all_text += text + "\n"
-
-        # ========== IMAGE HANDLING ==========
-        else:
-            # PIL → NumPy (NO cv2)
-            img = Image.open(file).convert("RGB")
-            img = np.array(img)
-
-            progress = st.progress(0)
-            status = st.empty()
-
-            status.info("🔍 Preprocessing document...")
-            progress.progress(30)
-
-            status.info("🧠 Running OCR engine...")
-            progress.progress(65)
-
-            result = ocr_on_image(img)
-
-            st.write("🔎 RAW OCR RESULT:")
-            st.write(result)
-
-            text = result["final"]["text"]
-            confidence = result["final"]["confidence"]
-
-            # 🔎 TEMP DEBUG (STEP 3)
-            st.write("OCR TEXT LENGTH:", len(text))
-            st.write("OCR CONFIDENCE:", confidence)
-
-            st.markdown("<div class='card'>", unsafe_allow_html=True)
-            st.markdown("**📄 OCR Extracted Text**")
-            st.text_area("", text, height=150, key=f"img_text_{file.name}")
-
-            color = "🟢" if confidence >= 80 else "🟡"
-            st.markdown(f"{color} **OCR Confidence:** {confidence}%")
-            st.progress(confidence / 100)
-            st.markdown("</div>", unsafe_allow_html=True)
-
-            report = verify_document(text, confidence, file.name)
-            final_report.update(report)
-            all_text += text + "\n"
+        if job is None:
+            if held.get(key) == "cancelled":
+                st.warning("⏹️ Processing was cancelled")
+            else:
+                st.warning("🚦 The OCR service is busy right now. Please try again shortly.")
+            if st.button("🔁 Retry", key=f"retry_{file.name}_{key[0]}"):
+                held.pop(key, None)
+                st.rerun()
+            continue
+
+        job.touch(session_id)
+        state = job.snapshot()
+
+        for i, page in enumerate(state["pages"]):
+            render_page(file, i, page, paged)
+            final_report.update(page["report"])
+            all_text += page["text"] + "\n"
+
+        if state["error"]:
+            st.error(f"❌ Processing failed: {state['error']}")
+        elif state["stage"] == "cancelled":
+            st.warning("⏹️ Processing was cancelled")
+        elif not state["done"]:
+            pending = True
+            st.progress(state["fraction"])
+            st.info(describe_progress(state))
+            if st.button("⏹️ Cancel", key=f"cancel_{file.name}_{key[0]}"):
+                manager.cancel(key, session_id)
+                held[key] = "cancelled"
+                st.rerun()
 
     # ---------------- VERIFICATION RESULTS ----------------
     st.markdown("## ✅ Verification Results")
@@ -250,4 +295,11 @@ if uploaded_files:
 # ---------------- COMBINED TEXT ----------------
 if all_text:
     st.subheader("📄 Combined Extracted Text")
-    st.text_area("", all_text, height=300, key="combined_text_area")
\ No newline at end of file
+    st.text_area("", all_text, height=300, key="combined_text_area")
+
+# ---------------- LIVE PROGRESS ----------------
+# Re-run the page while background jobs are still working so finished
+# pages and stage progress show up without user interaction
+if uploaded_files and pending:
+    time.sleep(0.5)
+    st.rerun()
@@ -0,0 +1,62 @@
+"""
+A/B OCR backends on the same documents through the full pipeline.
+
+    python -m benchmarks.bench_backends [--backends easyocr onnx] [--samples 20]
+"""
+import argparse
+
+from ocr.cpu_tuning import configure_cpu_env, apply_torch_threads, quantize_enabled
+
+configure_cpu_env()
+
+from benchmarks.common import char_accuracy, timed, print_table
+from benchmarks.synthetic import synthetic_set
+from ocr.backends import create_backend
+from ocr.model_bundle import warm_up
+from ocr.ocr_engine import ocr_on_image
+from verification.final_verification import verify_document
+
+
+def id_correct(report, truth):
+    if "Aadhaar Number" in truth:
+        return report.get("Aadhaar Number") == truth["Aadhaar Number"]
+    return report.get("PAN Number") == truth.get("PAN Number")
+
+
+def run_backend(name, samples):
+    backend, info = create_backend(name, ("en",), quantize_enabled())
+    warm_up(backend)
+
+    latencies, accuracy, correct = [], [], 0
+    for sample in samples:
+        result, seconds = timed(ocr_on_image, sample["image"], reader=backend)
+        text = result["final"]["text"]
+        report = verify_document(text, result["final"]["confidence"], sample["name"])
+
+        latencies.append(seconds)
+        accuracy.append(char_accuracy(text, sample["text"]))
+        correct += id_correct(report, sample["truth"])
+
+    return {
+        "backend": name,
+        "load_s": info["load_s"],
+        "mean_ms": round(1000 * sum(latencies) / len(latencies), 1),
+        "char_acc": round(sum(accuracy) / len(accuracy), 4),
+        "id_correct": f"{correct}/{len(samples)}"
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--backends", nargs="+", default=["easyocr", "onnx"])
+    parser.add_argument("--samples", type=int, default=20)
+    args = parser.parse_args()
+
+    apply_torch_threads()
+    samples = synthetic_set(args.samples)
+    rows = [run_backend(name, samples) for name in args.backends]
+    print_table(rows, ["backend", "load_s", "mean_ms", "char_acc", "id_correct"])
+
+
+if __name__ == "__main__":
+    main()
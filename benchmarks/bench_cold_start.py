@@ -0,0 +1,45 @@
+"""
+Cold-start time of a fresh process: classic weight loading vs snapshot.
+
+    python -m benchmarks.bench_cold_start [--runs 3]
+"""
+import argparse
+import json
+import os
+import subprocess
+import sys
+import time
+
+from benchmarks.common import print_table
+
+
+def cold_start(snapshot):
+    env = dict(os.environ, OCR_SNAPSHOT="1" if snapshot else "0")
+    start = time.perf_counter()
+    out = subprocess.run(
+        [sys.executable, "-m", "ocr.model_bundle", "warmup"],
+        env=env, check=True, capture_output=True, text=True
+    ).stdout
+    wall = time.perf_counter() - start
+    info = json.loads(out.strip().splitlines()[-1])
+    return {**info, "process_s": round(wall, 3)}
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--runs", type=int, default=3)
+    args = parser.parse_args()
+
+    # Make sure weights and snapshot exist before timing anything
+    subprocess.run([sys.executable, "-m", "ocr.model_bundle", "prepare"], check=True)
+
+    rows = []
+    for label, snapshot in (("weights", False), ("snapshot", True)):
+        for run in range(args.runs):
+            rows.append({"mode": label, "run": run + 1, **cold_start(snapshot)})
+
+    print_table(rows, ["mode", "run", "source", "load_s", "warmup_s", "process_s"])
+
+
+if __name__ == "__main__":
+    main()
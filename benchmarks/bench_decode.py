@@ -0,0 +1,80 @@
+"""
+Upload decode cost: full decode + convert + copy vs ocr.image_io.decode_image.
+
+    python -m benchmarks.bench_decode [--runs 5] [--max-side 3200]
+"""
+import argparse
+import io
+
+import numpy as np
+from PIL import Image
+
+from benchmarks.common import print_table, timed
+from benchmarks.synthetic import synthetic_set
+from ocr.image_io import decode_image
+
+# (label, width, height, format); phone photos carry EXIF orientation 6
+SIZES = [
+    ("scan-2MP", 1600, 1200, "JPEG"),
+    ("phone-12MP", 4000, 3000, "JPEG"),
+    ("phone-48MP", 8000, 6000, "JPEG"),
+    ("scan-png", 7000, 5000, "PNG"),
+]
+
+
+def encode(card, width, height, fmt):
+    img = Image.fromarray(card).resize((width, height), Image.BICUBIC)
+    buf = io.BytesIO()
+    if fmt == "JPEG":
+        exif = img.getexif()
+        exif[0x0112] = 6
+        img.save(buf, "JPEG", quality=90, exif=exif.tobytes())
+    else:
+        img.save(buf, fmt)
+    return buf.getvalue()
+
+
+def baseline(file_bytes):
+    return np.array(Image.open(io.BytesIO(file_bytes)).convert("RGB"))
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--runs", type=int, default=5)
+    parser.add_argument("--max-side", type=int, default=None)
+    args = parser.parse_args()
+
+    card = synthetic_set(count=1)[0]["image"]
+    kwargs = {"max_side": args.max_side} if args.max_side else {}
+
+    rows = []
+    for label, width, height, fmt in SIZES:
+        data = encode(card, width, height, fmt)
+        base_s, fast_s = [], []
+        for _ in range(args.runs):
+            base, t = timed(baseline, data)
+            base_s.append(t)
+            (fast, info), t = timed(decode_image, data, **kwargs)
+            fast_s.append(t)
+
+        base_ms = 1000 * float(np.median(base_s))
+        fast_ms = 1000 * float(np.median(fast_s))
+        rows.append({
+            "input": label,
+            "file_kb": len(data) // 1024,
+            "baseline_ms": round(base_ms, 1),
+            "fast_ms": round(fast_ms, 1),
+            "speedup": round(base_ms / max(fast_ms, 1e-6), 2),
+            "decoded": "%dx%d" % info["decoded"],
+            "reduced": info["reduced"],
+            # the baseline leaves EXIF-rotated photos sideways
+            "exif_rotated": info["exif_orientation"] != 1,
+            "mb_saved": round((base.nbytes - fast.nbytes) / 2 ** 20, 1),
+        })
+
+    print_table(rows, ["input", "file_kb", "baseline_ms", "fast_ms", "speedup",
+                       "decoded", "reduced", "exif_rotated", "mb_saved"])
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,80 @@
+"""
+fp32 vs int8 EasyOCR on the synthetic card set, plus a thread sweep.
+
+    python -m benchmarks.bench_quantization [--samples 20]
+"""
+import argparse
+
+from ocr.cpu_tuning import configure_cpu_env, available_cores, auto_tune
+
+configure_cpu_env()
+
+import torch
+
+from benchmarks.common import char_accuracy, id_found, timed, print_table
+from benchmarks.synthetic import synthetic_set
+from ocr.ocr_engine import preprocess_image
+from ocr.cpu_tuning import detector_canvas_size
+from ocr.model_bundle import build_reader
+
+
+def run_set(reader, samples):
+    latencies, accuracy, ids = [], [], 0
+    for sample in samples:
+        img = preprocess_image(sample["image"])
+        lines, seconds = timed(
+            reader.readtext, img, detail=0, canvas_size=detector_canvas_size()
+        )
+        text = " ".join(lines)
+        latencies.append(seconds)
+        accuracy.append(char_accuracy(text, sample["text"]))
+        ids += id_found(text, sample["truth"])
+
+    latencies.sort()
+    return {
+        "mean_ms": round(1000 * sum(latencies) / len(latencies), 1),
+        "p95_ms": round(1000 * latencies[int(0.95 * (len(latencies) - 1))], 1),
+        "char_acc": round(sum(accuracy) / len(accuracy), 4),
+        "id_hit": f"{ids}/{len(samples)}"
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--samples", type=int, default=20)
+    args = parser.parse_args()
+
+    samples = synthetic_set(args.samples)
+    cores = available_cores()
+    intra, inter, concurrent = auto_tune(cores)
+    print(f"cores={cores} auto-tune: intra_op={intra} inter_op={inter} "
+          f"max_concurrent={concurrent}\n")
+
+    # ---------------- PRECISION ----------------
+    torch.set_num_threads(intra)
+    rows = []
+    for label, quantize in (("fp32", False), ("int8-dynamic", True)):
+        reader = build_reader(("en",), quantize=quantize)
+        run_set(reader, samples[:2])   # warm-up
+        rows.append({"mode": label, **run_set(reader, samples)})
+    print_table(rows, ["mode", "mean_ms", "p95_ms", "char_acc", "id_hit"])
+
+    # ---------------- THREADS ----------------
+    print()
+    reader = build_reader(("en",), quantize=True)
+    rows = []
+    for threads in sorted({1, 2, 4, intra, cores}):
+        if threads > cores:
+            continue
+        torch.set_num_threads(threads)
+        result = run_set(reader, samples)
+        rows.append({
+            "threads": threads,
+            "auto": "*" if threads == intra else "",
+            **result
+        })
+    print_table(rows, ["threads", "auto", "mean_ms", "p95_ms", "char_acc"])
+
+
+if __name__ == "__main__":
+    main()
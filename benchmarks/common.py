@@ -0,0 +1,34 @@
+import difflib
+import re
+import time
+
+
+def char_accuracy(predicted, expected):
+    """Similarity of two texts after upper-casing and collapsing whitespace."""
+    norm = lambda t: re.sub(r"\s+", " ", (t or "").upper()).strip()
+    return difflib.SequenceMatcher(None, norm(predicted), norm(expected)).ratio()
+
+
+def id_found(text, truth):
+    compact = re.sub(r"\s+", "", (text or "").upper())
+    for key in ("Aadhaar Number", "PAN Number"):
+        if key in truth:
+            return truth[key] in compact
+    return False
+
+
+def timed(fn, *args, **kwargs):
+    start = time.perf_counter()
+    result = fn(*args, **kwargs)
+    return result, time.perf_counter() - start
+
+
+def print_table(rows, columns):
+    widths = [
+        max(len(col), *(len(str(row.get(col, ""))) for row in rows))
+        for col in columns
+    ]
+    print("  ".join(col.ljust(w) for col, w in zip(columns, widths)))
+    print("  ".join("-" * w for w in widths))
+    for row in rows:
+        print("  ".join(str(row.get(col, "")).ljust(w) for col, w in zip(columns, widths)))
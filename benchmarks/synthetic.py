@@ -0,0 +1,124 @@
+import random
+
+import numpy as np
+from PIL import Image, ImageDraw, ImageFont, ImageFilter
+
+from verification.utils import verhoeff_generate
+
+
+# ===== SYNTHETIC ID CARD SET =====
+# Deterministic Aadhaar / PAN look-alikes with known ground truth, used by
+# the benchmarks to compare speed and accuracy between pipeline variants.
+
+FIRST_NAMES = ["Ravi", "Anita", "Suresh", "Priya", "Mohan", "Kavya", "Arjun", "Meera"]
+LAST_NAMES = ["Kumar", "Sharma", "Reddy", "Iyer", "Patel", "Singh", "Das", "Nair"]
+
+CARD_SIZE = (1000, 630)
+
+
+def _font(size):
+    for name in ("DejaVuSans-Bold.ttf", "DejaVuSans.ttf", "arial.ttf"):
+        try:
+            return ImageFont.truetype(name, size)
+        except OSError:
+            continue
+    try:
+        return ImageFont.load_default(size=size)
+    except TypeError:
+        return ImageFont.load_default()
+
+
+def random_aadhaar(rng):
+    body = str(rng.randint(2, 9)) + "".join(str(rng.randint(0, 9)) for _ in range(10))
+    num = body + verhoeff_generate(body)
+    return f"{num[:4]} {num[4:8]} {num[8:]}"
+
+
+def random_pan(rng):
+    letters = "ABCDEFGHIJKLMNOPQRSTUVWXYZ"
+    return (
+        "".join(rng.choice(letters) for _ in range(3)) + "P" +
+        rng.choice(letters) +
+        "".join(str(rng.randint(0, 9)) for _ in range(4)) +
+        rng.choice(letters)
+    )
+
+
+def random_dob(rng):
+    return f"{rng.randint(1, 28):02d}/{rng.randint(1, 12):02d}/{rng.randint(1960, 2004)}"
+
+
+def _draw_lines(lines, header_color):
+    img = Image.new("RGB", CARD_SIZE, (250, 250, 245))
+    draw = ImageDraw.Draw(img)
+    draw.rectangle((0, 0, CARD_SIZE[0], 90), fill=header_color)
+
+    y = 20
+    for text, size in lines:
+        draw.text((40, y), text, fill=(10, 10, 10), font=_font(size))
+        y += size + 28
+    return img
+
+
+def aadhaar_card(rng):
+    name = f"{rng.choice(FIRST_NAMES)} {rng.choice(LAST_NAMES)}"
+    number = random_aadhaar(rng)
+    dob = random_dob(rng)
+    gender = rng.choice(["MALE", "FEMALE"])
+
+    lines = [
+        ("GOVERNMENT OF INDIA", 34),
+        (name, 32),
+        (f"DOB: {dob}", 30),
+        (gender, 30),
+        (number, 48),
+        ("Aadhaar - Aam Aadmi ka Adhikar", 28),
+    ]
+    truth = {
+        "Document Type": "Aadhaar Card",
+        "Aadhaar Number": number.replace(" ", ""),
+        "Name": name,
+        "DOB": dob
+    }
+    return _draw_lines(lines, (255, 153, 51)), lines, truth
+
+
+def pan_card(rng):
+    name = f"{rng.choice(FIRST_NAMES)} {rng.choice(LAST_NAMES)}".upper()
+    pan = random_pan(rng)
+    dob = random_dob(rng)
+
+    lines = [
+        ("INCOME TAX DEPARTMENT", 34),
+        (name, 32),
+        (dob, 30),
+        ("Permanent Account Number", 28),
+        (pan, 44),
+    ]
+    truth = {
+        "Document Type": "PAN Card",
+        "PAN Number": pan,
+        "Name": name,
+        "DOB": dob
+    }
+    return _draw_lines(lines, (30, 90, 200)), lines, truth
+
+
+def synthetic_set(count=20, seed=7, blur=0.6):
+    """
+    List of {"name", "image" (RGB uint8 array), "text", "truth"}.
+    """
+    rng = random.Random(seed)
+    samples = []
+    for i in range(count):
+        make = aadhaar_card if i % 2 == 0 else pan_card
+        img, lines, truth = make(rng)
+        if blur:
+            img = img.filter(ImageFilter.GaussianBlur(blur))
+        samples.append({
+            "name": f"synthetic_{i:03d}",
+            "image": np.array(img),
+            "text": " ".join(t for t, _ in lines),
+            "truth": truth
+        })
+    return samples
@@ -0,0 +1,40 @@
+import os
+import time
+
+
+# ===== BACKEND REGISTRY =====
+# OCR_BACKEND=easyocr (default) | onnx
+# The onnx backend additionally needs `pip install onnxruntime` and the
+# graphs from `python -m ocr.backends.onnx_export`; EasyOCR stays
+# installed either way (export, CRAFT box post-processing).
+def backend_name():
+    return os.environ.get("OCR_BACKEND", "easyocr").lower()
+
+
+def create_backend(name=None, langs=("en",), quantize=True):
+    """
+    Returns (backend, info) where info = {"backend", "source", "load_s"}.
+    Backends are imported lazily so a deployment only needs the runtime
+    it actually uses.
+    """
+    name = name or backend_name()
+
+    if name == "easyocr":
+        from ocr.backends.easyocr_backend import EasyOCRBackend
+        from ocr.model_bundle import load_reader
+
+        reader, info = load_reader(langs, quantize)
+        return EasyOCRBackend(reader), {"backend": name, **info}
+
+    if name == "onnx":
+        from ocr.backends.onnx_backend import ONNXBackend
+
+        start = time.perf_counter()
+        backend = ONNXBackend(lang=langs[0])
+        return backend, {
+            "backend": name,
+            "source": "onnx",
+            "load_s": round(time.perf_counter() - start, 3)
+        }
+
+    raise ValueError(f"Unknown OCR backend: {name}")
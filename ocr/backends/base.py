@@ -0,0 +1,149 @@
+import time
+
+import numpy as np
+from PIL import Image, ImageDraw
+
+
+# ===== BOX HELPERS =====
+# A box is 4 [x, y] points (EasyOCR order: tl, tr, br, bl).
+def rect_to_box(x_min, x_max, y_min, y_max):
+    return [[x_min, y_min], [x_max, y_min], [x_max, y_max], [x_min, y_max]]
+
+
+def box_bounds(box):
+    xs = [p[0] for p in box]
+    ys = [p[1] for p in box]
+    return min(xs), min(ys), max(xs), max(ys)
+
+
+def crop_box(image, box):
+    h, w = image.shape[:2]
+    x0, y0, x1, y1 = box_bounds(box)
+    x0, y0 = max(int(x0), 0), max(int(y0), 0)
+    x1, y1 = min(int(np.ceil(x1)), w), min(int(np.ceil(y1)), h)
+    if x1 <= x0 or y1 <= y0:
+        return None
+    return image[y0:y1, x0:x1]
+
+
+def reading_order(results):
+    """Top-to-bottom lines, left-to-right within a line."""
+    if not results:
+        return results
+    heights = [box_bounds(r[0])[3] - box_bounds(r[0])[1] for r in results]
+    line_h = max(float(np.median(heights)), 1.0)
+    return sorted(
+        results,
+        key=lambda r: (
+            round(box_bounds(r[0])[1] / (line_h * 0.6)),
+            box_bounds(r[0])[0]
+        )
+    )
+
+
+def group_paragraphs(results):
+    """
+    Merge vertically adjacent lines into [box, text] paragraphs, the same
+    shape EasyOCR returns for paragraph=True.
+    """
+    paragraphs = []
+    for box, text, _conf in reading_order(results):
+        x0, y0, x1, y1 = box_bounds(box)
+        if paragraphs:
+            px0, py0, px1, py1 = paragraphs[-1]["rect"]
+            line_h = y1 - y0
+            if y0 - py1 <= line_h and x0 <= px1 + line_h and x1 >= px0 - line_h:
+                paragraphs[-1]["rect"] = (
+                    min(px0, x0), min(py0, y0), max(px1, x1), max(py1, y1)
+                )
+                paragraphs[-1]["text"].append(text)
+                continue
+        paragraphs.append({"rect": (x0, y0, x1, y1), "text": [text]})
+
+    return [
+        [rect_to_box(p["rect"][0], p["rect"][2], p["rect"][1], p["rect"][3]),
+         " ".join(p["text"])]
+        for p in paragraphs
+    ]
+
+
+# ===== BACKEND INTERFACE =====
+class OCRBackend:
+    """
+    detect(image)            → list of boxes
+    recognize(crops)         → list of (text, confidence), one per crop
+    detect_batch / recognize_batch process several inputs per call.
+
+    readtext() composes the two and returns EasyOCR-shaped output, so
+    ocr_on_image / verify_document work unchanged with any backend.
+    """
+
+    name = "base"
+
+    def detect(self, image, canvas_size=2560):
+        raise NotImplementedError
+
+    def recognize(self, crops, allowlist=None):
+        raise NotImplementedError
+
+    def detect_batch(self, images, canvas_size=2560):
+        return [self.detect(image, canvas_size=canvas_size) for image in images]
+
+    def recognize_batch(self, crop_lists, allowlist=None):
+        flat = [crop for crops in crop_lists for crop in crops]
+        recognized = self.recognize(flat, allowlist=allowlist) if flat else []
+
+        out, i = [], 0
+        for crops in crop_lists:
+            out.append(recognized[i:i + len(crops)])
+            i += len(crops)
+        return out
+
+    def readtext(self, image, detail=1, paragraph=False, allowlist=None,
+                 canvas_size=2560):
+        image = _as_array(image)
+        boxes = self.detect(image, canvas_size=canvas_size)
+
+        crops, kept = [], []
+        for box in boxes:
+            crop = crop_box(image, box)
+            if crop is not None:
+                crops.append(crop)
+                kept.append(box)
+
+        recognized = self.recognize(crops, allowlist=allowlist) if crops else []
+        results = reading_order([
+            (box, text, conf)
+            for box, (text, conf) in zip(kept, recognized)
+            if text
+        ])
+
+        if paragraph:
+            results = group_paragraphs(results)
+        if detail == 0:
+            return [r[1] for r in results]
+        return results
+
+
+def _as_array(image):
+    if isinstance(image, Image.Image):
+        return np.array(image.convert("RGB"))
+    return image
+
+
+# ===== WARM-UP =====
+def _dummy_image():
+    img = Image.new("RGB", (640, 160), (255, 255, 255))
+    draw = ImageDraw.Draw(img)
+    draw.text((20, 60), "GOVERNMENT OF INDIA 1234 5678", fill=(0, 0, 0))
+    return np.array(img)
+
+
+def warm_up(reader):
+    """
+    One dummy inference so lazy kernel selection / allocations happen
+    before the first real document. Returns seconds spent.
+    """
+    start = time.perf_counter()
+    reader.readtext(_dummy_image(), detail=0)
+    return round(time.perf_counter() - start, 3)
@@ -0,0 +1,67 @@
+import numpy as np
+from PIL import Image
+
+from ocr.backends.base import OCRBackend, rect_to_box
+
+
+class EasyOCRBackend(OCRBackend):
+    """
+    Wraps an easyocr.Reader. readtext() is delegated as-is so results are
+    identical to calling the reader directly.
+    """
+
+    name = "easyocr"
+
+    # white rows between stacked crops so CRNN never sees a neighbour
+    CROP_GAP = 8
+
+    def __init__(self, reader):
+        self.reader = reader
+
+    def readtext(self, image, **kwargs):
+        return self.reader.readtext(image, **kwargs)
+
+    def detect(self, image, canvas_size=2560):
+        horizontal, free = self.reader.detect(image, canvas_size=canvas_size)
+        boxes = [rect_to_box(*rect) for rect in horizontal[0]]
+        boxes.extend([list(map(list, box)) for box in free[0]])
+        return boxes
+
+    def recognize(self, crops, allowlist=None):
+        """
+        All crops are stacked into one grayscale canvas and recognized in
+        a single batched reader.recognize call.
+        """
+        if not crops:
+            return []
+
+        grays = [_to_gray(crop) for crop in crops]
+        width = max(g.shape[1] for g in grays)
+        height = sum(g.shape[0] for g in grays) + self.CROP_GAP * len(grays)
+
+        canvas = np.full((height, width), 255, dtype=np.uint8)
+        rects, y = [], 0
+        for g in grays:
+            h, w = g.shape
+            canvas[y:y + h, :w] = g
+            rects.append([0, w, y, y + h])
+            y += h + self.CROP_GAP
+
+        results = self.reader.recognize(
+            canvas,
+            horizontal_list=rects,
+            free_list=[],
+            batch_size=len(rects),
+            allowlist=allowlist,
+            detail=1
+        )
+
+        # Map back by the top edge of each box (output order isn't promised)
+        by_top = {int(box[0][1]): (text, float(conf)) for box, text, conf in results}
+        return [by_top.get(rect[2], ("", 0.0)) for rect in rects]
+
+
+def _to_gray(crop):
+    if crop.ndim == 2:
+        return crop.astype(np.uint8)
+    return np.array(Image.fromarray(crop.astype(np.uint8)).convert("L"))
@@ -0,0 +1,191 @@
+import json
+import math
+import os
+
+import numpy as np
+from PIL import Image
+
+# onnxruntime is optional (not in requirements.txt): only OCR_BACKEND=onnx
+# deployments install it
+try:
+    import onnxruntime as ort
+except ImportError as e:
+    raise ImportError(
+        "OCR_BACKEND=onnx needs ONNX Runtime: pip install onnxruntime"
+    ) from e
+
+# CRAFT box post-processing is reused from EasyOCR (a required dependency)
+# so both backends turn score maps into the same line boxes; only the
+# forward passes differ.
+from easyocr import craft_utils
+from easyocr.utils import group_text_box
+
+from ocr.backends.base import OCRBackend, rect_to_box
+from ocr.cpu_tuning import thread_settings
+
+
+# ===== DETECTOR (CRAFT) SETTINGS — EasyOCR defaults =====
+TEXT_THRESHOLD = 0.7
+LOW_TEXT = 0.4
+LINK_THRESHOLD = 0.4
+MIN_SIZE = 20
+MEAN = np.array([0.485, 0.456, 0.406], dtype=np.float32) * 255.0
+STD = np.array([0.229, 0.224, 0.225], dtype=np.float32) * 255.0
+
+RECOGNIZER_BATCH = 16
+MAX_CROP_WIDTH = 2048
+
+
+def onnx_model_dir():
+    from ocr.model_bundle import model_dir
+    return os.path.join(model_dir(), "onnx")
+
+
+def _session(path, threads):
+    opts = ort.SessionOptions()
+    opts.intra_op_num_threads = threads
+    opts.inter_op_num_threads = 1
+    opts.graph_optimization_level = ort.GraphOptimizationLevel.ORT_ENABLE_ALL
+    return ort.InferenceSession(path, opts, providers=["CPUExecutionProvider"])
+
+
+def _custom_mean(x):
+    # EasyOCR's sequence confidence
+    return float(x.prod() ** (2.0 / np.sqrt(len(x)))) if len(x) else 0.0
+
+
+class ONNXBackend(OCRBackend):
+    """
+    CRAFT + CRNN graphs exported by `python -m ocr.backends.onnx_export`,
+    run with ONNX Runtime on CPU.
+    """
+
+    name = "onnx"
+
+    def __init__(self, directory=None, lang="en"):
+        directory = directory or onnx_model_dir()
+        with open(os.path.join(directory, f"meta_{lang}.json")) as f:
+            meta = json.load(f)
+
+        threads = thread_settings()["intra_op"]
+        self.detector = _session(os.path.join(directory, meta["detector"]), threads)
+        self.recognizer = _session(os.path.join(directory, meta["recognizer"]), threads)
+        self.characters = ["[blank]"] + list(meta["characters"])
+        self.img_h = meta.get("img_h", 64)
+
+    # ---------------- DETECTION ----------------
+    def _prepare(self, image, canvas_size):
+        if image.ndim == 2:
+            image = np.stack([image] * 3, axis=-1)
+        h, w = image.shape[:2]
+
+        ratio = min(canvas_size / max(h, w), 1.0)
+        target_h, target_w = int(h * ratio), int(w * ratio)
+        resized = np.array(
+            Image.fromarray(image.astype(np.uint8)).resize(
+                (target_w, target_h), Image.BILINEAR
+            ),
+            dtype=np.float32
+        )
+
+        # CRAFT wants both sides padded to a multiple of 32
+        pad_h = target_h + (32 - target_h % 32) % 32
+        pad_w = target_w + (32 - target_w % 32) % 32
+        canvas = np.zeros((pad_h, pad_w, 3), dtype=np.float32)
+        canvas[:target_h, :target_w] = resized
+
+        x = ((canvas - MEAN) / STD).transpose(2, 0, 1)[None]
+        return x, 1.0 / ratio
+
+    def _boxes_from_scores(self, scores, inv_ratio):
+        boxes, _, _ = craft_utils.getDetBoxes(
+            scores[:, :, 0], scores[:, :, 1],
+            TEXT_THRESHOLD, LINK_THRESHOLD, LOW_TEXT, False
+        )
+        boxes = craft_utils.adjustResultCoordinates(boxes, inv_ratio, inv_ratio)
+        text_box = [np.array(b).astype(np.int32).reshape(-1) for b in boxes]
+
+        horizontal, free = group_text_box(text_box, 0.1, 0.5, 0.5, 0.5, 0.1, True)
+        out = [
+            rect_to_box(*rect) for rect in horizontal
+            if max(rect[1] - rect[0], rect[3] - rect[2]) > MIN_SIZE
+        ]
+        out.extend([list(map(list, box)) for box in free])
+        return out
+
+    def detect(self, image, canvas_size=2560):
+        x, inv_ratio = self._prepare(image, canvas_size)
+        scores = self.detector.run(None, {self.detector.get_inputs()[0].name: x})[0]
+        return self._boxes_from_scores(scores[0], inv_ratio)
+
+    def detect_batch(self, images, canvas_size=2560):
+        prepared = [self._prepare(image, canvas_size) for image in images]
+        shapes = {x.shape for x, _ in prepared}
+        if len(shapes) != 1:
+            return super().detect_batch(images, canvas_size=canvas_size)
+
+        batch = np.concatenate([x for x, _ in prepared])
+        scores = self.detector.run(None, {self.detector.get_inputs()[0].name: batch})[0]
+        return [
+            self._boxes_from_scores(s, inv_ratio)
+            for s, (_, inv_ratio) in zip(scores, prepared)
+        ]
+
+    # ---------------- RECOGNITION ----------------
+    def _normalize_crop(self, crop):
+        img = Image.fromarray(crop.astype(np.uint8)).convert("L")
+        w = min(max(1, math.ceil(self.img_h * img.width / max(img.height, 1))), MAX_CROP_WIDTH)
+        img = img.resize((w, self.img_h), Image.BICUBIC)
+        return (np.asarray(img, dtype=np.float32) / 255.0 - 0.5) / 0.5
+
+    def _decode(self, logits, allowlist):
+        probs = np.exp(logits - logits.max(axis=2, keepdims=True))
+        probs /= probs.sum(axis=2, keepdims=True)
+
+        if allowlist:
+            allowed = set(allowlist)
+            mask = np.array(
+                [i == 0 or c in allowed for i, c in enumerate(self.characters)]
+            )
+            probs = probs * mask
+            probs /= np.maximum(probs.sum(axis=2, keepdims=True), 1e-12)
+
+        values = probs.max(axis=2)
+        indices = probs.argmax(axis=2)
+
+        out = []
+        for seq_idx, seq_val in zip(indices, values):
+            chars, prev = [], 0
+            for idx in seq_idx:
+                if idx != 0 and idx != prev:
+                    chars.append(self.characters[idx])
+                prev = idx
+            out.append(("".join(chars), _custom_mean(seq_val[seq_idx != 0])))
+        return out
+
+    def recognize(self, crops, allowlist=None):
+        if not crops:
+            return []
+
+        normalized = [self._normalize_crop(crop) for crop in crops]
+        # Similar widths share a batch → little padding
+        order = sorted(range(len(normalized)), key=lambda i: normalized[i].shape[1])
+        results = [None] * len(normalized)
+        input_name = self.recognizer.get_inputs()[0].name
+
+        for start in range(0, len(order), RECOGNIZER_BATCH):
+            idx = order[start:start + RECOGNIZER_BATCH]
+            width = max(normalized[i].shape[1] for i in idx)
+
+            batch = np.empty((len(idx), 1, self.img_h, width), dtype=np.float32)
+            for row, i in enumerate(idx):
+                img = normalized[i]
+                batch[row, 0, :, :img.shape[1]] = img
+                # pad by repeating the last column, like EasyOCR's NormalizePAD
+                batch[row, 0, :, img.shape[1]:] = img[:, -1:]
+
+            logits = self.recognizer.run(None, {input_name: batch})[0]
+            for i, decoded in zip(idx, self._decode(logits, allowlist)):
+                results[i] = decoded
+
+        return results
@@ -0,0 +1,87 @@
+"""
+Export EasyOCR's CRAFT detector and CRNN recognizer to ONNX.
+
+    python -m ocr.backends.onnx_export [--lang en]
+
+Exports from the fp32 reader: dynamically quantized modules don't export.
+ONNX Runtime applies its own CPU graph optimizations at load time.
+"""
+import argparse
+import json
+import os
+
+import torch
+
+from ocr.backends.onnx_backend import onnx_model_dir
+from ocr.model_bundle import build_reader
+
+
+class _RecognizerGraph(torch.nn.Module):
+    # CTC models ignore the `text` argument of forward(input, text)
+    def __init__(self, model):
+        super().__init__()
+        self.model = model
+
+    def forward(self, x):
+        return self.model(x, None)
+
+
+class _DetectorGraph(torch.nn.Module):
+    # CRAFT returns (scores, feature); only scores are needed
+    def __init__(self, model):
+        super().__init__()
+        self.model = model
+
+    def forward(self, x):
+        return self.model(x)[0]
+
+
+def export(lang="en", directory=None, opset=13):
+    directory = directory or onnx_model_dir()
+    os.makedirs(directory, exist_ok=True)
+
+    reader = build_reader((lang,), quantize=False)
+    detector = _DetectorGraph(reader.detector).eval()
+    recognizer = _RecognizerGraph(reader.recognizer).eval()
+
+    detector_file = "craft.onnx"
+    recognizer_file = f"crnn_{lang}.onnx"
+
+    with torch.no_grad():
+        torch.onnx.export(
+            detector,
+            torch.randn(1, 3, 640, 640),
+            os.path.join(directory, detector_file),
+            input_names=["image"],
+            output_names=["scores"],
+            dynamic_axes={"image": {0: "batch", 2: "height", 3: "width"},
+                          "scores": {0: "batch", 1: "height", 2: "width"}},
+            opset_version=opset
+        )
+        torch.onnx.export(
+            recognizer,
+            torch.randn(1, 1, 64, 256),
+            os.path.join(directory, recognizer_file),
+            input_names=["crops"],
+            output_names=["logits"],
+            dynamic_axes={"crops": {0: "batch", 3: "width"},
+                          "logits": {0: "batch", 1: "steps"}},
+            opset_version=opset
+        )
+
+    with open(os.path.join(directory, f"meta_{lang}.json"), "w") as f:
+        json.dump({
+            "detector": detector_file,
+            "recognizer": recognizer_file,
+            "characters": reader.character,
+            "img_h": 64
+        }, f)
+
+    return directory
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--lang", default="en")
+    args = parser.parse_args()
+    print(f"exported to {export(args.lang)}")
@@ -0,0 +1,187 @@
+import os
+import time
+
+import numpy as np
+from PIL import Image
+
+
+# ===== MULTI-CARD SEGMENTATION =====
+# Branches scan an Aadhaar front + back, or an Aadhaar + a PAN, on one A4
+# sheet. Before OCR the page is split into card regions by recursive
+# XY-cuts on a downscaled "ink or colour" mask:
+#   * mask: pixels darker than the sheet (text, card edges / shadows) or
+#     clearly coloured, dilated so text lines inside one card merge
+#   * cut:  split wherever a band of empty rows / columns is wide enough
+#     to be the gap between two cards, recurse on each side
+#   * keep: blocks shaped like an ID card (~1.59:1, either way up)
+# Borderless cards (white stock on a white sheet) leave no card outline,
+# only their text / photo / header, which the cut splits into line-sized
+# blocks. When the outline pass finds fewer than two cards, the mask is
+# dilated further so each card's content merges into one block, and
+# blocks that fit inside an ID card at the sheet's scale (much smaller
+# than a document section, which spans the page) are kept instead.
+# Fewer than two cards either way → [] and the page is OCR'd as a whole.
+
+SEG_SIDE = 800
+MIN_GAP = 0.015          # of the page side (~4 mm on A4)
+DILATE = 9               # px at SEG_SIDE
+MIN_CARD_AREA = 0.03     # of the page area
+CARD_ASPECT = (1.2, 2.1)
+MIN_COVERAGE = 0.8       # of all content that must fall inside cards
+CARD_PADDING = 0.02      # of the card size, added around each crop
+
+# content-block pass (borderless cards)
+CONTENT_DILATE = 0.012   # extra dilation, of the mask's long side
+CONTENT_FIT = (0.15, 0.5)  # block long side, of the page's short side
+CONTENT_PADDING = 0.06   # content sits inside the card's margins
+
+
+def segmentation_enabled():
+    return os.environ.get("OCR_CARD_SEGMENTATION", "1") != "0"
+
+
+def _content_mask(image):
+    """Boolean mask at ~SEG_SIDE and the page-pixels-per-mask-pixel factor."""
+    if isinstance(image, np.ndarray):
+        image = Image.fromarray(image.astype(np.uint8))
+    image = image.convert("RGB")
+    f = max(1, int(np.ceil(max(image.size) / SEG_SIDE)))
+
+    # min-pooling keeps thin card edges / text strokes a box filter would
+    # average away
+    gray = np.asarray(image.convert("L"))
+    h, w = gray.shape[0] // f, gray.shape[1] // f
+    gray = gray[:h * f, :w * f]
+    gray = np.minimum.reduce([gray[k::f] for k in range(f)])
+    gray = np.minimum.reduce([gray[:, k::f] for k in range(f)]).astype(np.int16)
+    sheet = np.percentile(gray, 90)
+
+    hsv = np.asarray(image.reduce(f).convert("HSV"), dtype=np.int16)[:h, :w]
+    mask = (gray < sheet - 40) | ((hsv[..., 1] > 60) & (hsv[..., 2] > 60))
+
+    return _dilate(mask, DILATE // 2), f, image.size
+
+
+def _dilate(mask, r):
+    """Square dilation by r px: windowed 'any' via cumulative sums, per axis."""
+    for axis in (0, 1):
+        c = np.cumsum(mask, axis=axis, dtype=np.int32)
+        c = np.concatenate([np.zeros_like(c.take([0], axis=axis)), c], axis=axis)
+        n = mask.shape[axis]
+        hi = np.minimum(np.arange(n) + r + 1, n)
+        lo = np.maximum(np.arange(n) - r, 0)
+        mask = (c.take(hi, axis=axis) - c.take(lo, axis=axis)) > 0
+    return mask
+
+
+def _runs(profile, min_gap):
+    """(start, end) of non-empty runs separated by >= min_gap empty cells."""
+    filled = np.flatnonzero(profile)
+    if len(filled) == 0:
+        return []
+    breaks = np.flatnonzero(np.diff(filled) > min_gap)
+    starts = np.concatenate([[filled[0]], filled[breaks + 1]])
+    ends = np.concatenate([filled[breaks], [filled[-1]]]) + 1
+    return list(zip(starts.tolist(), ends.tolist()))
+
+
+def _xy_cut(mask, x0, y0, min_gap, depth=0, out=None):
+    out = [] if out is None else out
+    region = mask[y0[0]:y0[1], x0[0]:x0[1]]
+
+    rows = _runs(region.any(axis=1), min_gap)
+    cols = _runs(region.any(axis=0), min_gap)
+    if not rows or not cols:
+        return out
+
+    # shrink to content first
+    top, bottom = y0[0] + rows[0][0], y0[0] + rows[-1][1]
+    left, right = x0[0] + cols[0][0], x0[0] + cols[-1][1]
+
+    if depth >= 6 or (len(rows) == 1 and len(cols) == 1):
+        out.append((left, top, right, bottom))
+        return out
+
+    if len(rows) > 1:
+        for a, b in rows:
+            _xy_cut(mask, (left, right), (y0[0] + a, y0[0] + b), min_gap, depth + 1, out)
+    else:
+        for a, b in cols:
+            _xy_cut(mask, (x0[0] + a, x0[0] + b), (top, bottom), min_gap, depth + 1, out)
+    return out
+
+
+def _card_like(block, page_area):
+    x0, y0, x1, y1 = block
+    w, h = x1 - x0, y1 - y0
+    if w * h < MIN_CARD_AREA * page_area:
+        return False
+    aspect = max(w, h) / max(min(w, h), 1)
+    return CARD_ASPECT[0] <= aspect <= CARD_ASPECT[1]
+
+
+def _fits_card(block, shape):
+    """Content block small enough to sit on one ID card of the sheet."""
+    x0, y0, x1, y1 = block
+    side = max(x1 - x0, y1 - y0) / max(min(shape), 1)
+    return CONTENT_FIT[0] <= side <= CONTENT_FIT[1]
+
+
+def _shrink(mask, block):
+    x0, y0, x1, y1 = block
+    region = mask[y0:y1, x0:x1]
+    rows, cols = np.flatnonzero(region.any(axis=1)), np.flatnonzero(region.any(axis=0))
+    if len(rows) == 0:
+        return block
+    return x0 + cols[0], y0 + rows[0], x0 + cols[-1] + 1, y0 + rows[-1] + 1
+
+
+def _pick_cards(mask, min_gap, keep):
+    h, w = mask.shape
+    cards = [b for b in _xy_cut(mask, (0, w), (0, h), min_gap) if keep(b)]
+    covered = sum(
+        mask[y0:y1, x0:x1].sum() for x0, y0, x1, y1 in cards
+    ) / max(mask.sum(), 1)
+    if len(cards) < 2 or covered < MIN_COVERAGE:
+        return []
+    return cards
+
+
+def segment_cards(image):
+    """
+    Returns {"cards": [(x0, y0, x1, y1), ...], "mode", "elapsed_ms"} in
+    page pixels, top-to-bottom then left-to-right; "cards" is empty unless
+    the page holds two or more separate cards. mode: "outline" (card
+    edges found), "content" (borderless cards) or None.
+    """
+    start = time.perf_counter()
+    mask, scale, (full_w, full_h) = _content_mask(image)
+    h, w = mask.shape
+    min_gap = max(2, int(MIN_GAP * max(h, w)))
+
+    mode, padding = "outline", CARD_PADDING
+    cards = _pick_cards(mask, min_gap, lambda b: _card_like(b, h * w))
+    if not cards:
+        mode, padding = "content", CONTENT_PADDING
+        merged = _dilate(mask, max(1, int(CONTENT_DILATE * max(h, w))))
+        cards = _pick_cards(merged, min_gap, lambda b: _fits_card(b, (h, w)))
+        # back to the content itself, without the merge dilation's halo
+        cards = [_shrink(mask, b) for b in cards]
+    if not cards:
+        mode = None
+
+    boxes = []
+    for x0, y0, x1, y1 in sorted(cards, key=lambda b: (b[1], b[0])):
+        pad_x, pad_y = padding * (x1 - x0), padding * (y1 - y0)
+        boxes.append((
+            max(0, int((x0 - pad_x) * scale)),
+            max(0, int((y0 - pad_y) * scale)),
+            min(full_w, int(np.ceil((x1 + pad_x) * scale))),
+            min(full_h, int(np.ceil((y1 + pad_y) * scale)))
+        ))
+
+    return {
+        "cards": boxes,
+        "mode": mode,
+        "elapsed_ms": round(1000 * (time.perf_counter() - start), 2)
+    }
@@ -0,0 +1,81 @@
+import os
+
+
+# ===== CPU INFERENCE TUNING =====
+# We run CPU-only. Torch intra-op threads × concurrent OCR documents
+# should not exceed the cores we actually have, otherwise concurrent
+# inferences thrash each other. Everything here can be overridden:
+#   OCR_THREADS          intra-op threads per inference
+#   OCR_INTEROP_THREADS  inter-op threads (default 1)
+#   OCR_MAX_CONCURRENT   concurrent OCR documents (see ocr/scheduler.py)
+#   OCR_QUANTIZE         "1" = int8 dynamic quantization (default), "0" = fp32
+#   OCR_CANVAS_SIZE      max side fed to the CRAFT detector
+
+
+def available_cores():
+    try:
+        return len(os.sched_getaffinity(0))
+    except (AttributeError, OSError):
+        return os.cpu_count() or 1
+
+
+def auto_tune(cores=None):
+    """
+    Pick (intra_op_threads, inter_op_threads, max_concurrent) for a host.
+    Small hosts give every core to one inference; bigger hosts run
+    several inferences with ~4 threads each (GEMMs stop scaling well
+    beyond that for EasyOCR-sized models).
+    """
+    if cores is None:
+        cores = available_cores()
+    cores = max(1, cores)
+
+    if cores <= 4:
+        intra, concurrent = cores, 1
+    else:
+        intra = 4
+        concurrent = cores // intra
+
+    return intra, 1, concurrent
+
+
+def thread_settings():
+    intra, inter, concurrent = auto_tune()
+    return {
+        "intra_op": int(os.environ.get("OCR_THREADS", intra)),
+        "inter_op": int(os.environ.get("OCR_INTEROP_THREADS", inter)),
+        "max_concurrent": int(os.environ.get("OCR_MAX_CONCURRENT", concurrent))
+    }
+
+
+def configure_cpu_env():
+    """
+    Must run before torch is imported: OpenMP/MKL read these once.
+    """
+    settings = thread_settings()
+    os.environ["CUDA_VISIBLE_DEVICES"] = ""
+    os.environ.setdefault("OMP_NUM_THREADS", str(settings["intra_op"]))
+    os.environ.setdefault("MKL_NUM_THREADS", str(settings["intra_op"]))
+    os.environ.setdefault("OCR_MAX_CONCURRENT", str(settings["max_concurrent"]))
+    return settings
+
+
+def apply_torch_threads():
+    import torch
+
+    settings = thread_settings()
+    torch.set_num_threads(settings["intra_op"])
+    try:
+        torch.set_num_interop_threads(settings["inter_op"])
+    except RuntimeError:
+        # Only allowed before the first inter-op parallel work starts
+        pass
+    return settings
+
+
+def quantize_enabled():
+    return os.environ.get("OCR_QUANTIZE", "1") != "0"
+
+
+def detector_canvas_size():
+    return int(os.environ.get("OCR_CANVAS_SIZE", "2560"))
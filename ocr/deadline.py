@@ -0,0 +1,55 @@
+import os
+import time
+
+
+# ===== DEADLINES & CANCELLATION =====
+# A running reader.readtext call cannot be interrupted, so budgets are
+# enforced *between* OCR passes: a pass is skipped when the budget is
+# spent (or when the previous pass suggests it won't fit), and the
+# result is marked truncated instead of blocking the worker for minutes.
+
+
+class JobCancelled(Exception):
+    pass
+
+
+def default_budget():
+    return float(os.environ.get("OCR_JOB_BUDGET", "60"))
+
+
+class Deadline:
+    def __init__(self, budget=None, cancel_check=None, expires_at=None):
+        if expires_at is None:
+            if budget is None:
+                budget = default_budget()
+            expires_at = time.monotonic() + budget
+        self.expires_at = expires_at
+        self.cancel_check = cancel_check
+
+    def remaining(self):
+        return max(0.0, self.expires_at - time.monotonic())
+
+    def expired(self):
+        return self.remaining() <= 0
+
+    def check(self):
+        """Raise JobCancelled if the owner of this job has gone away."""
+        if self.cancel_check is not None and self.cancel_check():
+            raise JobCancelled("Job cancelled")
+
+    def split(self, parts):
+        """
+        Child deadline with an equal share of what is left.
+        Time a part doesn't use flows on to the following parts.
+        """
+        share = self.remaining() / max(parts, 1)
+        return Deadline(
+            cancel_check=self.cancel_check,
+            expires_at=min(time.monotonic() + share, self.expires_at)
+        )
+
+    def allows(self, expected_cost=0.0):
+        self.check()
+        if self.expired():
+            return False
+        return expected_cost <= self.remaining()
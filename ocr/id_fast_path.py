@@ -0,0 +1,182 @@
+import os
+import re
+
+from ocr.backends.base import box_bounds, crop_box
+from verification.utils import verhoeff_check
+
+
+# ===== ID-NUMBER FAST PATH =====
+# The fields we really need are the Aadhaar number, PAN and DOB. Instead
+# of recognizing the whole page with the full charset and digging the
+# number out of noisy text, we:
+#   1. run detection once,
+#   2. rank line boxes that *look* like an ID/DOB line (aspect ratio,
+#      height, position on the card),
+#   3. recognize only those crops with a constrained charset,
+#   4. validate inline (Verhoeff / PAN format / real date),
+#   5. read the name line next to them with a letters-only charset
+#      (Aadhaar: the line right above DOB; PAN: the first line under the
+#      header). A name that doesn't validate is reported as not read.
+# If a valid ID comes out, the full-page OCR passes can be skipped.
+
+DIGITS = "0123456789"
+PAN_CHARS = "ABCDEFGHIJKLMNOPQRSTUVWXYZ0123456789"
+DATE_CHARS = "0123456789/-"
+NAME_CHARS = "ABCDEFGHIJKLMNOPQRSTUVWXYZabcdefghijklmnopqrstuvwxyz ."
+
+# width / height of a single text line holding the number
+ID_ASPECT = (3.5, 16.0)
+MAX_CANDIDATES = 4
+MAX_NAME_CANDIDATES = 3
+
+# header / label lines that pass the name charset
+NOT_NAMES = {
+    "GOVERNMENT", "GOVT", "INDIA", "INCOME", "TAX", "DEPARTMENT", "UNIQUE",
+    "IDENTIFICATION", "AUTHORITY", "AADHAAR", "NAME", "FATHER", "FATHERS",
+    "DATE", "BIRTH", "DOB", "MALE", "FEMALE", "PERMANENT", "ACCOUNT",
+    "NUMBER", "CARD", "SIGNATURE"
+}
+
+PAN_RE = re.compile(r"[A-Z]{5}[0-9]{4}[A-Z]")
+DATE_RE = re.compile(r"(0[1-9]|[12]\d|3[01])[/-](0[1-9]|1[0-2])[/-](19|20)\d{2}")
+
+
+def fast_path_enabled():
+    return os.environ.get("OCR_ID_FAST_PATH", "0") == "1"
+
+
+def rank_candidates(boxes, image_height, limit=MAX_CANDIDATES):
+    """
+    Best-looking ID-number lines first. Aadhaar numbers are printed large
+    in the lower half, PAN numbers mid-card; both are single, wide lines.
+    """
+    heights = [box_bounds(b)[3] - box_bounds(b)[1] for b in boxes]
+    tallest = max(heights, default=1) or 1
+
+    scored = []
+    for box, h in zip(boxes, heights):
+        x0, y0, x1, y1 = box_bounds(box)
+        if h <= 0:
+            continue
+        aspect = (x1 - x0) / h
+        if not ID_ASPECT[0] <= aspect <= ID_ASPECT[1]:
+            continue
+
+        rel_y = ((y0 + y1) / 2) / max(image_height, 1)
+        score = h / tallest + 0.5 * rel_y
+        scored.append((score, box))
+
+    scored.sort(key=lambda s: -s[0])
+    return [box for _, box in scored[:limit]]
+
+
+def valid_aadhaar(text):
+    num = re.sub(r"\D", "", text or "")
+    if len(num) != 12 or num[0] in "01":
+        return None
+    return num if verhoeff_check(num) else None
+
+
+def valid_pan(text):
+    match = PAN_RE.search(re.sub(r"\s", "", (text or "").upper()))
+    return match.group() if match else None
+
+
+def valid_date(text):
+    match = DATE_RE.search(re.sub(r"\s", "", text or ""))
+    return match.group() if match else None
+
+
+def valid_name(text):
+    words = re.sub(r"[^A-Za-z ]", " ", text or "").upper().split()
+    if not 1 <= len(words) <= 5 or any(len(w) < 2 for w in words):
+        return None
+    if any(w in NOT_NAMES for w in words):
+        return None
+    name = " ".join(words)
+    return name if len(name) >= 4 else None
+
+
+def name_candidates(boxes, anchor, pan, top=0, limit=MAX_NAME_CANDIDATES):
+    """
+    Lines between `top` and `anchor` (the DOB line, else the ID line) that
+    overlap it horizontally: nearest first on Aadhaar, top-most first on
+    PAN (the father's name sits between the name and DOB there).
+    """
+    ax0, ay0, ax1, _ = box_bounds(anchor)
+    above = []
+    for box in boxes:
+        x0, y0, x1, y1 = box_bounds(box)
+        if top <= y0 and y1 <= ay0 and x1 > ax0 and x0 < ax1 + (ax1 - ax0):
+            above.append((y0, box))
+    above.sort(key=lambda a: a[0], reverse=not pan)
+    return [box for _, box in above[:limit]]
+
+
+def read_id_fields(image, backend, canvas_size=2560):
+    """
+    Returns {"aadhaar", "pan", "dob", "name", "boxes"}; values are None
+    when not found. `image` is the preprocessed page (RGB uint8 array).
+    """
+    boxes = backend.detect(image, canvas_size=canvas_size)
+    candidates = rank_candidates(boxes, image.shape[0])
+
+    crops, kept = [], []
+    for box in candidates:
+        crop = crop_box(image, box)
+        if crop is not None:
+            crops.append(crop)
+            kept.append(box)
+
+    found = {"aadhaar": None, "pan": None, "dob": None, "name": None, "boxes": kept}
+    if not crops:
+        return found
+
+    # Digits first: Aadhaar is the common case and the cheapest charset
+    id_box = None
+    for box, (text, _conf) in zip(kept, backend.recognize(crops, allowlist=DIGITS + " ")):
+        number = valid_aadhaar(text)
+        if number and found["aadhaar"] is None:
+            found["aadhaar"], id_box = number, box
+
+    if found["aadhaar"] is None:
+        for box, (text, _conf) in zip(kept, backend.recognize(crops, allowlist=PAN_CHARS)):
+            number = valid_pan(text)
+            if number and found["pan"] is None:
+                found["pan"], id_box = number, box
+
+    dob_box = None
+    for box, (text, _conf) in zip(kept, backend.recognize(crops, allowlist=DATE_CHARS)):
+        date = valid_date(text)
+        if date and found["dob"] is None:
+            found["dob"], dob_box = date, box
+
+    anchor = dob_box or id_box
+    if anchor is not None:
+        # new-style PAN cards print the number above the name
+        top = 0
+        if id_box is not None and box_bounds(id_box)[3] <= box_bounds(anchor)[1]:
+            top = box_bounds(id_box)[3]
+        lines = name_candidates(boxes, anchor, pan=found["pan"] is not None, top=top)
+        name_crops = [c for c in (crop_box(image, b) for b in lines) if c is not None]
+        if name_crops:
+            for text, _conf in backend.recognize(name_crops, allowlist=NAME_CHARS):
+                found["name"] = found["name"] or valid_name(text)
+
+    return found
+
+
+def fields_to_text(found):
+    """Synthetic OCR text the verification stage can parse."""
+    parts = []
+    if found.get("name"):
+        # first: field_extractor takes the first upper-case run as the name
+        parts.append(found["name"])
+    if found.get("aadhaar"):
+        num = found["aadhaar"]
+        parts.append(f"{num[:4]} {num[4:8]} {num[8:]}")
+    if found.get("pan"):
+        parts.append(found["pan"])
+    if found.get("dob"):
+        parts.append(f"DOB: {found['dob']}")
+    return " ".join(parts)
@@ -0,0 +1,175 @@
+import io
+import os
+import time
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+
+import numpy as np
+from PIL import Image, ImageOps
+
+from ocr.cpu_tuning import detector_canvas_size
+
+
+# ===== FAST IMAGE DECODE =====
+# A 12–48 MP phone JPEG used to be fully decoded, converted and copied
+# before anything looked at it. Now:
+#   * the header (size, EXIF orientation) is read without touching pixels
+#   * JPEG draft mode lets libjpeg's DCT scaling decode straight at 1/2,
+#     1/4 or 1/8 size when that still covers what the detector reads: its
+#     canvas (OCR_CANVAS_SIZE), less DRAFT_UNDERSHOOT, in RGB
+#   * other formats at 2× the limit or more get an integer box reduce();
+#     no fractional resample afterwards — on a 12 MP JPEG that costs more
+#     than the decode itself, so images may stay up to 2× over the limit
+#   * EXIF orientation is applied once, and the buffer leaves as one
+#     C-contiguous uint8 H×W×3 array — the layout preprocess_image and
+#     the detector expect
+
+# A4 at ~270 DPI; ID text gains nothing from more pixels, only decode time
+MAX_IMAGE_SIDE = int(os.environ.get("OCR_MAX_IMAGE_SIDE", "3200"))
+
+# DCT scaling only halves: a 4000 px photo decodes at 4000 or 2000 px.
+# The detector reads at most its canvas (2560 px by default), and ID print
+# stays legible a quarter below it, so the draft may undershoot that much.
+DRAFT_UNDERSHOOT = 0.75
+
+# pages of a multi-page document decoded at once (current + read-ahead)
+PAGE_WINDOW = int(os.environ.get("OCR_PAGE_WINDOW", "2"))
+
+EXIF_ORIENTATION = 0x0112
+TIFF_MAGIC = (b"II*\x00", b"MM\x00*")
+
+
+def _target_size(size, max_side):
+    w, h = size
+    scale = min(1.0, max_side / max(w, h, 1))
+    return max(1, round(w * scale)), max(1, round(h * scale))
+
+
+def _reduce(img, max_side):
+    if max(img.size) < 2 * max_side:
+        return img, 1
+    factor = max(img.size) // max_side
+    return img.convert("RGB").reduce(factor), factor
+
+
+def _to_array(img, orientation):
+    if img.mode != "RGB":
+        img = img.convert("RGB")
+    if orientation != 1:
+        img = ImageOps.exif_transpose(img)
+    return np.array(img, dtype=np.uint8)
+
+
+def draft_side(max_side=MAX_IMAGE_SIDE, canvas_size=None):
+    """Long side a JPEG draft decode has to cover (see DRAFT_UNDERSHOOT)."""
+    canvas = canvas_size or detector_canvas_size()
+    return min(max_side, round(canvas * DRAFT_UNDERSHOOT))
+
+
+def decode_image(file_bytes, max_side=MAX_IMAGE_SIDE, canvas_size=None):
+    """
+    Returns (RGB uint8 array, info); info records the original / decoded
+    size, the 1/n reduction, the EXIF orientation and decode time.
+    canvas_size: detector canvas the image is read at (None = OCR_CANVAS_SIZE).
+    """
+    start = time.perf_counter()
+    img = Image.open(io.BytesIO(file_bytes))
+    original = img.size
+    orientation = img.getexif().get(EXIF_ORIENTATION, 1)
+
+    reduced = 1
+    if img.format == "JPEG":
+        # picks the largest 1/2^k reduction that still covers the target;
+        # the long side is what counts, which EXIF rotation doesn't change
+        img.draft("RGB", _target_size(original, draft_side(max_side, canvas_size)))
+        reduced = max(1, round(original[0] / img.size[0]))
+    else:
+        img, reduced = _reduce(img, max_side)
+
+    array = _to_array(img, orientation)
+    return array, {
+        "original": original,
+        "decoded": (array.shape[1], array.shape[0]),
+        "reduced": reduced,
+        "exif_orientation": orientation,
+        "decode_ms": round(1000 * (time.perf_counter() - start), 2)
+    }
+
+
+# ===== LAZY MULTI-PAGE SOURCES =====
+# Multi-page PDFs / TIFFs are not decoded up front: LazyPages knows the
+# page count from the header and decodes page i only when the pipeline
+# reaches it, reading ahead at most `window - 1` pages on one background
+# thread, so memory stays bounded by the window, not by the file size.
+
+class LazyPages:
+
+    def __init__(self, count, load, window=PAGE_WINDOW, close=None):
+        self.count = count
+        self.load = load
+        self.window = max(1, window)
+        self._close = close
+
+    def close(self):
+        """Releases the source document; call once no page is loading."""
+        if self._close is not None:
+            self._close()
+            self._close = None
+
+    def __len__(self):
+        return self.count
+
+    def __iter__(self):
+        if self.window == 1:
+            for i in range(self.count):
+                yield self.load(i)
+            return
+
+        # a single decode thread also keeps seek()-style loaders serialized
+        with ThreadPoolExecutor(max_workers=1, thread_name_prefix="page-decode") as pool:
+            pending = deque()
+            submitted = 0
+            for i in range(self.count):
+                while submitted < min(self.count, i + self.window):
+                    pending.append(pool.submit(self.load, submitted))
+                    submitted += 1
+                yield pending.popleft().result()
+
+
+def is_tiff(file_bytes):
+    return file_bytes[:4] in TIFF_MAGIC
+
+
+def _raw_frame_view(img, file_bytes, max_side):
+    """
+    Zero-copy view of an uncompressed, contiguous 8-bit RGB frame straight
+    over the uploaded bytes; None when the frame needs a real decode.
+    """
+    if len(img.tile) != 1 or max(img.size) >= 2 * max_side:
+        return None
+    codec, extents, offset, args = img.tile[0]
+    w, h = img.size
+    rawmode, stride, direction = (tuple(args) + (0, 1))[:3]
+    if (
+        codec != "raw" or rawmode != "RGB" or direction != 1 or
+        stride not in (0, w * 3) or tuple(extents) != (0, 0, w, h) or
+        img.tag_v2.get(EXIF_ORIENTATION, 1) != 1 or
+        offset + w * h * 3 > len(file_bytes)
+    ):
+        return None
+    return np.frombuffer(file_bytes, np.uint8, w * h * 3, offset).reshape(h, w, 3)
+
+
+def tiff_pages(file_bytes, max_side=MAX_IMAGE_SIDE, window=PAGE_WINDOW):
+    """Frames of a (multi-page) TIFF as LazyPages of RGB uint8 arrays."""
+    img = Image.open(io.BytesIO(file_bytes))
+
+    def load(i):
+        img.seek(i)
+        view = _raw_frame_view(img, file_bytes, max_side)
+        if view is not None:
+            return view
+        frame, _ = _reduce(img, max_side)
+        return _to_array(frame, img.tag_v2.get(EXIF_ORIENTATION, 1))
+
+    return LazyPages(getattr(img, "n_frames", 1), load, window, close=img.close)
@@ -0,0 +1,88 @@
+import numpy as np
+
+from ocr.result import OCRLines
+
+
+# ===== GEOMETRY-AWARE PASS MERGE =====
+# The full and enhanced passes read the same page in the same coordinate
+# frame, so most lines come back twice with slightly different boxes and
+# readings. Instead of keeping both and de-duplicating on exact text, each
+# text region keeps only its most confident reading:
+#   1. sort all lines by recognizer confidence              O(n log n)
+#   2. accept a line unless it overlaps an accepted one      grid index,
+#      (IoU / containment), looked up in a uniform grid      ~O(1) per line
+#   3. return the survivors in reading order                 O(n log n)
+
+SAME_REGION_IOU = 0.5
+SAME_REGION_CONTAINED = 0.8
+DEFAULT_CONF = 0.6          # paragraph-style results carry no confidence
+
+
+def box_overlap(a, b):
+    """(IoU, intersection / smaller area) of two (x0, y0, x1, y1) bounds."""
+    ix = max(0, min(a[2], b[2]) - max(a[0], b[0]))
+    iy = max(0, min(a[3], b[3]) - max(a[1], b[1]))
+    inter = ix * iy
+    area_a = (a[2] - a[0]) * (a[3] - a[1])
+    area_b = (b[2] - b[0]) * (b[3] - b[1])
+    union = area_a + area_b - inter
+    iou = inter / union if union > 0 else 0.0
+    contained = inter / max(min(area_a, area_b), 1e-6)
+    return iou, contained
+
+
+class SpatialIndex:
+    """Uniform grid over box bounds; query returns ids of nearby boxes."""
+
+    def __init__(self, cell):
+        self.cell = max(float(cell), 1.0)
+        self.buckets = {}
+        self.bounds = []
+
+    def _cells(self, bounds):
+        x0, y0, x1, y1 = (int(v // self.cell) for v in bounds)
+        for cy in range(y0, y1 + 1):
+            for cx in range(x0, x1 + 1):
+                yield cx, cy
+
+    def insert(self, bounds):
+        idx = len(self.bounds)
+        self.bounds.append(bounds)
+        for key in self._cells(bounds):
+            self.buckets.setdefault(key, []).append(idx)
+        return idx
+
+    def query(self, bounds):
+        found = set()
+        for key in self._cells(bounds):
+            found.update(self.buckets.get(key, ()))
+        return found
+
+    def overlaps(self, bounds, iou=SAME_REGION_IOU, contained=SAME_REGION_CONTAINED):
+        for idx in self.query(bounds):
+            o_iou, o_contained = box_overlap(bounds, self.bounds[idx])
+            if o_iou >= iou or o_contained >= contained:
+                return True
+        return False
+
+
+def merge_passes(results):
+    """
+    results: (box, text, conf) from any number of passes over one frame.
+    Returns OCRLines with one reading per text region, in reading order.
+    """
+    lines = OCRLines.from_results(results, default_conf=DEFAULT_CONF)
+    if not len(lines):
+        return lines
+
+    bounds = lines.bounds()
+    # a few line heights per cell: a line spans a handful of cells at most
+    index = SpatialIndex(4 * float(np.median(bounds[:, 3] - bounds[:, 1])))
+
+    kept = []
+    for i in lines.by_confidence():
+        if not index.overlaps(bounds[i]):
+            index.insert(bounds[i])
+            kept.append(i)
+
+    return lines.select(kept).reading_order()
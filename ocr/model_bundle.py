@@ -0,0 +1,160 @@
+"""
+Offline model bundle + pre-serialized reader snapshot.
+
+    python -m ocr.model_bundle prepare     # download weights, write snapshot, warm up
+    python -m ocr.model_bundle warmup      # load (snapshot if present) + dummy inference
+"""
+import json
+import os
+import sys
+import time
+
+import easyocr
+import torch
+
+# re-exported: the CLI and benchmarks warm readers up from here
+from ocr.backends.base import warm_up
+
+
+# ===== MODEL LOCATIONS =====
+# OCR_MODEL_DIR   weights + snapshots (default ./models)
+# OCR_OFFLINE=1   never touch the network; fail fast if weights are missing
+# OCR_SNAPSHOT=0  don't read/write reader snapshots
+def model_dir():
+    return os.environ.get("OCR_MODEL_DIR", "./models")
+
+
+def offline_mode():
+    return os.environ.get("OCR_OFFLINE", "0") == "1"
+
+
+def snapshots_enabled():
+    return os.environ.get("OCR_SNAPSHOT", "1") != "0"
+
+
+def _precision(quantize):
+    return "int8" if quantize else "fp32"
+
+
+def snapshot_path(langs, quantize):
+    name = f"reader_{'-'.join(sorted(langs))}_{_precision(quantize)}.pt"
+    return os.path.join(model_dir(), name)
+
+
+def _snapshot_meta(langs, quantize):
+    # A snapshot is only valid for the exact library versions that wrote it
+    return {
+        "easyocr": getattr(easyocr, "__version__", "unknown"),
+        "torch": torch.__version__,
+        "langs": sorted(langs),
+        "quantize": bool(quantize)
+    }
+
+
+# ===== BUILD / LOAD =====
+def build_reader(langs, quantize):
+    """
+    Classic EasyOCR construction. Uses local weights only when they are
+    already there, so a bundled container never waits on the network.
+    """
+    os.makedirs(model_dir(), exist_ok=True)
+    kwargs = dict(
+        gpu=False,
+        model_storage_directory=model_dir(),
+        quantize=quantize,
+        verbose=False
+    )
+    try:
+        return easyocr.Reader(list(langs), download_enabled=False, **kwargs)
+    except FileNotFoundError:
+        if offline_mode():
+            raise FileNotFoundError(
+                f"OCR weights for {list(langs)} missing in {model_dir()} "
+                "and OCR_OFFLINE=1 – run `python -m ocr.model_bundle prepare`"
+            )
+        return easyocr.Reader(list(langs), download_enabled=True, **kwargs)
+
+
+def save_snapshot(reader, langs, quantize):
+    """
+    Pickle the fully built (already quantized) reader. Loading it skips
+    state-dict remapping and re-quantization, which dominate cold start.
+    """
+    path = snapshot_path(langs, quantize)
+    tmp_path = path + ".tmp"
+    torch.save(reader, tmp_path)
+    os.replace(tmp_path, path)
+
+    with open(path + ".json", "w") as f:
+        json.dump(_snapshot_meta(langs, quantize), f)
+    return path
+
+
+def load_snapshot(langs, quantize):
+    """The pickled reader, or None (missing, stale or unreadable snapshot)."""
+    path = snapshot_path(langs, quantize)
+    if not os.path.isfile(path) or not os.path.isfile(path + ".json"):
+        return None
+
+    try:
+        with open(path + ".json") as f:
+            if json.load(f) != _snapshot_meta(langs, quantize):
+                return None
+        try:
+            return torch.load(path, weights_only=False)
+        except TypeError:
+            # torch < 1.13 has no weights_only argument
+            return torch.load(path)
+    except Exception as e:
+        # a broken snapshot only costs the slower load from weights
+        print(f"snapshot not loaded ({path}): {type(e).__name__}: {e}", file=sys.stderr)
+        return None
+
+
+def load_reader(langs=("en",), quantize=True):
+    """
+    Returns (reader, info) where info = {"source", "load_s"}.
+    """
+    start = time.perf_counter()
+    reader = load_snapshot(langs, quantize) if snapshots_enabled() else None
+    source = "snapshot"
+
+    if reader is None:
+        reader = build_reader(langs, quantize)
+        source = "weights"
+        if snapshots_enabled():
+            try:
+                save_snapshot(reader, langs, quantize)
+            except Exception:
+                # Read-only model dir: keep serving, just slower next time
+                pass
+
+    return reader, {
+        "source": source,
+        "load_s": round(time.perf_counter() - start, 3)
+    }
+
+
+# ===== CLI =====
+def main(argv):
+    from ocr.cpu_tuning import configure_cpu_env, apply_torch_threads, quantize_enabled
+
+    configure_cpu_env()
+    apply_torch_threads()
+
+    command = argv[1] if len(argv) > 1 else "warmup"
+    langs = ("en",)
+    quantize = quantize_enabled()
+
+    if command == "prepare":
+        reader = build_reader(langs, quantize)
+        path = save_snapshot(reader, langs, quantize)
+        print(f"snapshot written: {path}")
+
+    reader, info = load_reader(langs, quantize)
+    info["warmup_s"] = warm_up(reader)
+    print(json.dumps(info))
+
+
+if __name__ == "__main__":
+    main(sys.argv)
@@ -0,0 +1,121 @@
+import os
+import threading
+import time
+from collections import OrderedDict, deque
+
+from ocr.backends import backend_name, create_backend
+from ocr.backends.base import warm_up
+from ocr.cpu_tuning import quantize_enabled
+
+
+# ===== EXTRA-LANGUAGE READER REGISTRY =====
+# The English reader is loaded at startup (ocr_engine.load_ocr_backend).
+# Readers for other scripts are only built the first time a page actually
+# contains that script, then shared by every session. At most
+# OCR_MAX_EXTRA_READERS stay resident; the least recently used one is
+# dropped when another language needs room.
+#
+# A language whose reader failed to load (missing weights offline, out of
+# memory) is not retried on every page: further requests fail fast until
+# OCR_READER_RETRY_S has passed, doubling per consecutive failure up to
+# MAX_RETRY_BACKOFF times that.
+
+MAX_EXTRA_READERS = int(os.environ.get("OCR_MAX_EXTRA_READERS", "2"))
+RETRY_AFTER = float(os.environ.get("OCR_READER_RETRY_S", "300"))
+MAX_RETRY_BACKOFF = 8
+HISTORY = 50               # load / eviction records kept for the debug view
+
+
+class ReaderRegistry:
+
+    def __init__(self, max_readers=MAX_EXTRA_READERS):
+        self.max_readers = max(1, max_readers)
+        self._readers = OrderedDict()
+        self._loading = {}
+        self._lock = threading.Lock()
+        self._failures = {}
+        self.loads = deque(maxlen=HISTORY)
+        self.evictions = deque(maxlen=HISTORY)
+
+    def get(self, langs):
+        """Backend for `langs` (tuple), loading it on first use."""
+        key = tuple(langs)
+        with self._lock:
+            if key in self._readers:
+                self._readers.move_to_end(key)
+                return self._readers[key]
+            self._check_failed(key)
+            # one loader per language set; concurrent pages wait for it
+            gate = self._loading.setdefault(key, threading.Lock())
+
+        with gate:
+            with self._lock:
+                if key in self._readers:
+                    self._readers.move_to_end(key)
+                    return self._readers[key]
+                self._check_failed(key)
+
+            start = time.perf_counter()
+            try:
+                backend, info = create_backend(backend_name(), key, quantize_enabled())
+                info["warmup_s"] = warm_up(backend)
+            except Exception as e:
+                self._record_failure(key, e)
+                raise
+            info["total_s"] = round(time.perf_counter() - start, 3)
+
+            with self._lock:
+                self._readers[key] = backend
+                self._loading.pop(key, None)
+                self._failures.pop(key, None)
+                self.loads.append({"langs": key, **info})
+                while len(self._readers) > self.max_readers:
+                    evicted, _ = self._readers.popitem(last=False)
+                    self.evictions.append({"langs": evicted, "at": time.time()})
+            return backend
+
+    def _check_failed(self, key):
+        failure = self._failures.get(key)
+        if failure is not None and time.time() < failure["retry_at"]:
+            raise RuntimeError(
+                f"Reader for {key} failed to load ({failure['error']}); "
+                f"retrying after {time.ctime(failure['retry_at'])}"
+            )
+
+    def _record_failure(self, key, error):
+        with self._lock:
+            count = self._failures.get(key, {}).get("count", 0) + 1
+            delay = RETRY_AFTER * min(2 ** (count - 1), MAX_RETRY_BACKOFF)
+            now = time.time()
+            self._failures[key] = {
+                "error": f"{type(error).__name__}: {error}",
+                "count": count,
+                "at": now,
+                "retry_at": now + delay
+            }
+
+    def loaded(self):
+        with self._lock:
+            return list(self._readers)
+
+    def stats(self):
+        """Resident readers, recent loads / evictions, failed loads (debug view)."""
+        with self._lock:
+            return {
+                "loaded": list(self._readers),
+                "loads": list(self.loads),
+                "evictions": list(self.evictions),
+                "failed": {key: dict(f) for key, f in self._failures.items()}
+            }
+
+
+_registry = None
+_registry_lock = threading.Lock()
+
+
+def get_registry():
+    global _registry
+    with _registry_lock:
+        if _registry is None:
+            _registry = ReaderRegistry()
+        return _registry
@@ -1,54 +1,90 @@
-import os
-import unicodedata
 import numpy as np
 from PIL import Image, ImageFilter, ImageOps, ImageEnhance
-import easyocr
 import re
+import time
 import streamlit as st
 
+from ocr.cpu_tuning import (
+    configure_cpu_env,
+    apply_torch_threads,
+    quantize_enabled,
+    detector_canvas_size
+)
+
 # ===== STREAMLIT SAFE ENV =====
-os.environ["OMP_NUM_THREADS"] = "4"
-os.environ["CUDA_VISIBLE_DEVICES"] = ""
+# (before anything below imports torch)
+configure_cpu_env()
+
+from ocr.backends import backend_name, create_backend
+from ocr.backends.base import crop_box, warm_up
+from ocr.deadline import JobCancelled
+from ocr.triage import triage_enabled, triage_image
+from ocr.id_fast_path import fast_path_enabled, read_id_fields, fields_to_text
+from ocr.orientation import (
+    orientation_mode,
+    detect_layout,
+    estimate_orientation,
+    correct_image
+)
+from ocr.merge import merge_passes
+from ocr.recognition_cache import memo_enabled, MemoBackend, MAX_DISTANCE as MEMO_DISTANCE
+from ocr.script_detection import extra_scripts_enabled, non_latin_boxes, SCRIPT_LANGS
+from ocr.model_registry import get_registry
+from ocr.tiling import tiling_enabled, needs_tiling, readtext_tiled
+from ocr.profiles import get_profile
+from ocr.text_normalizer import (
+    normalize_ocr_line, normalizer_settings, NORMALIZER_VERSION
+)
+from ocr.visual_classifier import (
+    classify_visual,
+    route_for,
+    correct_orientation,
+    DEFAULT_ROUTE
+)
+
+# bump when passes / models change what OCR returns (see utils/stage_cache.py)
+OCR_VERSION = 2
+
+# recognizer confidence below which a routed result is not trusted
+LOW_LINE_CONFIDENCE = 0.4
 
 # ✅ LOAD ENGINES
 paddle_ocr = None
 
+# backend, source ("snapshot" / "weights" / "onnx"), load_s, warmup_s
+COLD_START = {}
+
 @st.cache_resource(show_spinner="Loading OCR engine (first run only)...")
+def load_ocr_backend(name):
+    apply_torch_threads()
+    # quantize=True → dynamic int8 for the recognizer's Linear/LSTM layers
+    backend, info = create_backend(name, ("en",), quantize_enabled())
+    info["warmup_s"] = warm_up(backend)
+    if memo_enabled():
+        # boilerplate header/footer lines are recognized once, then served
+        # from the line-crop memo (shared by all sessions)
+        backend = MemoBackend(backend)
+    info["recognition_memo"] = memo_enabled()
+    COLD_START.update(info)
+    return backend
+
 def load_easyocr_reader():
-    return easyocr.Reader(
-        ['en'],
-        gpu=False,
-        model_storage_directory="./models",
-        download_enabled=True
-    )
+    return load_ocr_backend("easyocr").reader
 
 def get_reader():
-    return load_easyocr_reader()
+    """Configured OCR backend (OCR_BACKEND); exposes EasyOCR's readtext()."""
+    return load_ocr_backend(backend_name())
 
 
 def normalize_text(text):
-    if not text:
-        return ""
-
-    text = unicodedata.normalize("NFKC", text)
-
-    replacements = {
-        "1ndia": "India",
-        "1dentification": "Identification",
-        "MA1E": "MALE",
-        "P1N": "PIN",
-        "5ub": "Sub",
-        "Disuict": "District",
-        "Govemment": "Government"
-    }
-
-    for k, v in replacements.items():
-        text = text.replace(k, v)
-
-    text = re.sub(r"[^\w\s:/\-\.]", " ", text)
-    return text.replace("\n", " ").strip()
-
-def compute_ocr_confidence(text):
+    """NFKC, OCR corrections, charset filter and whitespace in one pass."""
+    return normalize_ocr_line(text)
+
+def compute_ocr_confidence(text, line_confidence=None):
+    """
+    line_confidence: mean recognizer confidence of the merged lines (0-1),
+    when the text came from detail=1 passes.
+    """
     score = 40
 
     text_u = text.upper()
@@ -62,12 +98,19 @@ def compute_ocr_confidence(text):
     if len(text) > 300:
         score += 10
 
-    return min(score, 95)
+    if line_confidence is not None:
+        if line_confidence >= 0.8:
+            score += 10
+        elif line_confidence < LOW_LINE_CONFIDENCE:
+            score -= 15
 
+    return max(min(score, 95), 0)
 
 
 
-def preprocess_image(image_input):
+
+def preprocess_image(image_input, profile=None):
+    """profile: ocr.profiles name / dict for the upscale + enhancement knobs."""
     if image_input is None:
         return None
     
@@ -85,9 +128,12 @@ def preprocess_image(image_input):
     if img.width == 0 or img.height == 0:
         return None
 
+    profile = get_profile(profile)
+    min_width = profile["min_width"]
+
     # 🔒 SAFE RESIZE GUARD (NO OVER-UPSCALE)
-    if img.width < 900:
-        scale = 900 / img.width
+    if img.width < min_width:
+        scale = min_width / img.width
         img = img.resize(
             (int(img.width * scale), int(img.height * scale)),
             Image.BICUBIC
@@ -102,12 +148,13 @@ def preprocess_image(image_input):
     gray = img.convert("L")
 
     # 🔹 SINGLE SAFE DENOISE
-    gray = gray.filter(ImageFilter.MedianFilter(size=3))
+    if profile["median_size"]:
+        gray = gray.filter(ImageFilter.MedianFilter(size=profile["median_size"]))
 
     # 🔹 CONTROLLED ENHANCEMENTS (CLAMPED)
-    gray = ImageEnhance.Brightness(gray).enhance(1.03)
-    gray = ImageEnhance.Contrast(gray).enhance(1.5)
-    gray = ImageEnhance.Sharpness(gray).enhance(1.25)
+    gray = ImageEnhance.Brightness(gray).enhance(profile["brightness"])
+    gray = ImageEnhance.Contrast(gray).enhance(profile["contrast"])
+    gray = ImageEnhance.Sharpness(gray).enhance(profile["sharpness"])
 
     gray = ImageOps.autocontrast(gray, cutoff=1)
 
@@ -139,119 +186,386 @@ def crop_aadhaar_region(img):
     return img.crop((0, int(h * 0.55), w, h))
 
 
-def ocr_on_image(image):
-    extracted_text = []
-    confidences = []
-
-    if image is None:
-        return {"final": {"text": "", "confidence": 0}}
+def crop_pan_region(img):
+    # Name / father's name / DOB / PAN number sit in the left-middle
+    w, h = img.size
+    return img.crop((0, int(h * 0.2), int(w * 0.75), int(h * 0.95)))
+
+
+ROI_CROPS = {
+    "aadhaar": crop_aadhaar_region,
+    "pan": crop_pan_region
+}
+
+
+def _report_pass(progress, k, n):
+    if progress is not None:
+        progress(k, n)
+
+
+class _PassTracker:
+    """
+    Numbers the OCR passes for progress reporting and decides whether the
+    next one still fits the deadline, using the duration of the previous
+    pass as the cost estimate.
+    """
+
+    def __init__(self, progress, deadline, total):
+        self.progress = progress
+        self.deadline = deadline
+        self.total = total
+        self.count = 0
+        self.skipped = []
+        self.scripts = []
+        self.last_cost = 0.0
+        self._started = None
+
+    def start(self, name):
+        self.count += 1
+        if self.deadline is not None and not self.deadline.allows(self.last_cost):
+            self.skipped.append(name)
+            return False
+        _report_pass(self.progress, self.count, self.total)
+        self._started = time.monotonic()
+        return True
+
+    def finish(self):
+        if self._started is not None:
+            self.last_cost = time.monotonic() - self._started
+            self._started = None
+
+
+def _canvas_size(profile):
+    return profile["canvas_size"] or detector_canvas_size()
+
+
+def ocr_settings(profile=None):
+    """
+    Everything besides the image that changes what ocr_on_image returns:
+    part of the OCR stage-cache key, so flipping a backend or toggle
+    never serves results read under the old setting.
+    """
+    profile = get_profile(profile)
+    return (
+        ("backend", backend_name()),
+        ("quantize", quantize_enabled()),
+        ("canvas", _canvas_size(profile)),
+        ("triage", triage_enabled()),
+        ("orientation", orientation_mode()),
+        ("tiling", tiling_enabled()),
+        ("memo", memo_enabled() and MEMO_DISTANCE),
+        ("extra_scripts", extra_scripts_enabled()),
+        ("fast_path", fast_path_enabled() or profile["id_fast_path"]),
+        ("normalizer", NORMALIZER_VERSION, normalizer_settings()),
+        ("profile", tuple(sorted(profile.items())))
+    )
 
-    if isinstance(image, Image.Image):
-        image = np.array(image.convert("RGB"))
 
-    pil_image = Image.fromarray(image).convert("RGB")
+def _try_id_fast_path(image, reader, deadline, profile):
+    if deadline is not None and not deadline.allows():
+        return None
 
-    aadhaar_region = crop_aadhaar_region(pil_image)
-    processed_region = preprocess_image(aadhaar_region)
+    processed = preprocess_image(image, profile)
+    if processed is None:
+        return None
 
-    # ================= AADHAAR-ONLY OCR (CRITICAL FIX) =================
-    aadhaar_text_lines = []
     try:
-        if processed_region is not None:
-            aadhaar_results = get_reader().readtext(
-                processed_region,
-                detail=0,
-                paragraph=True
-            )
-            aadhaar_text_lines.extend(aadhaar_results)
+        found = read_id_fields(processed, reader, _canvas_size(profile))
+    except JobCancelled:
+        raise
     except Exception:
-        pass
-
-
-    # ❌ Neutralize extra resize safely
-    pil_image = pil_image.resize(
-        (pil_image.width, pil_image.height),
-        Image.BICUBIC
-    )
+        return None
 
-    image = np.array(pil_image)
+    if not (found["aadhaar"] or found["pan"]):
+        return None
 
-    # ================= FIRST OCR PASS =================
-    processed_1 = preprocess_image(image)
-    if processed_1 is None:
-        return {"final": {"text": "", "confidence": 0}}
+    text = fields_to_text(found)
+    return {
+        "final": {
+            "text": text,
+            "confidence": compute_ocr_confidence(text),
+            "truncated": False,
+            "skipped_passes": [],
+            "fast_path": {k: found[k] for k in ("aadhaar", "pan", "dob", "name")}
+        }
+    }
 
-    # ================= SECOND OCR PASS (SAFE) =================
-    enhanced_img = Image.fromarray(image).convert("RGB")
-    enhanced_img = ImageEnhance.Contrast(enhanced_img).enhance(1.1)
-    enhanced_img = ImageEnhance.Sharpness(enhanced_img).enhance(1.15)
-    enhanced_img = np.array(enhanced_img)
-    processed_2 = preprocess_image(enhanced_img)
 
-    reader = get_reader()
+def _readtext_lines(reader, processed, profile):
+    """detail=1 readtext; large scans go through overlapping tiles."""
+    if tiling_enabled() and needs_tiling(processed, _canvas_size(profile)):
+        return readtext_tiled(reader, processed, canvas_size=_canvas_size(profile))
+    return reader.readtext(processed, detail=1, canvas_size=_canvas_size(profile))
+
+
+def _read_other_scripts(processed, results, passes):
+    """
+    Re-reads lines that look Devanagari (etc.) with a reader for that
+    script, loaded on first use. Best effort: English results stand if
+    the extra reader can't be loaded.
+    """
+    if not extra_scripts_enabled():
+        return []
+
+    extra = []
+    for script, boxes in non_latin_boxes(processed, results).items():
+        if passes.deadline is not None and not passes.deadline.allows():
+            break
+        passes.scripts.append(script)
+        try:
+            backend = get_registry().get(SCRIPT_LANGS[script])
+            crops = [crop_box(processed, box) for box in boxes]
+            for box, (text, conf) in zip(boxes, backend.recognize(crops)):
+                if text:
+                    extra.append((box, text, conf))
+        except JobCancelled:
+            raise
+        except Exception:
+            pass
+    return extra
+
+
+def _run_passes(names, roi, pil_image, image, reader, passes, profile):
+    """
+    Runs the named OCR passes ("roi", "full", "enhanced").
+    Returns (roi paragraph lines, detail=1 results) or None when the page
+    can't be preprocessed.
+    """
+    region_lines = []
     all_results = []
 
-    try:
-        all_results.extend(reader.readtext(processed_1, detail=1))
-        if processed_2 is not None:
-            all_results.extend(reader.readtext(processed_2, detail=1))
-    except Exception:
-        return {"final": {"text": "", "confidence": 0}}
+    # ================= ROI-ONLY OCR (CRITICAL FIX) =================
+    if "roi" in names:
+        processed_region = preprocess_image(ROI_CROPS[roi](pil_image), profile)
+        if processed_region is not None and passes.start("roi"):
+            try:
+                region_lines.extend(reader.readtext(
+                    processed_region,
+                    detail=0,
+                    paragraph=profile["roi_paragraph"],
+                    canvas_size=_canvas_size(profile)
+                ))
+            except JobCancelled:
+                raise
+            except Exception:
+                pass
+            passes.finish()
 
-    # ================= MERGE RESULTS =================
-    for item in all_results:
-        if len(item) == 3:
-            _, text, conf = item
-        elif len(item) == 2:
-            _, text = item
-            conf = 0.6
-        else:
-            continue
-
-        if not isinstance(text, str):
-            continue
+    # ================= FIRST OCR PASS =================
+    if "full" in names:
+        processed_1 = preprocess_image(image, profile)
+        if processed_1 is None:
+            return None
 
-        clean_text = normalize_text(text)
+        if passes.start("full"):
+            full_results = _readtext_lines(reader, processed_1, profile)
+            all_results.extend(full_results)
+            passes.finish()
+            all_results.extend(_read_other_scripts(processed_1, full_results, passes))
 
-        # 🔒 STRICT GARBAGE FILTER
-        if len(clean_text) < 4:
-            continue
-        if sum(c.isdigit() for c in clean_text) > len(clean_text) * 0.7:
-            continue
+    # ================= SECOND OCR PASS (SAFE) =================
+    if "enhanced" in names:
+        enhanced_img = Image.fromarray(image).convert("RGB")
+        contrast, sharpness = profile["enhanced"]
+        enhanced_img = ImageEnhance.Contrast(enhanced_img).enhance(contrast)
+        enhanced_img = ImageEnhance.Sharpness(enhanced_img).enhance(sharpness)
+        enhanced_img = np.array(enhanced_img)
+        processed_2 = preprocess_image(enhanced_img, profile)
+
+        if processed_2 is not None and passes.start("enhanced"):
+            all_results.extend(_readtext_lines(reader, processed_2, profile))
+            passes.finish()
+
+    return region_lines, all_results
+
+
+def _merge_results(all_results, region_lines):
+    """
+    Returns (final_text, lines); lines is an OCRLines with one normalized
+    reading per text region across all passes, in reading order.
+    """
+    # ================= MERGE RESULTS =================
+    # one reading per region: the most confident pass wins
+    merged = merge_passes(all_results)
+    texts = [normalize_text(t) for t in merged.texts()]
 
-        extracted_text.append(clean_text)
-        confidences.append(conf)
+    # 🔒 STRICT GARBAGE FILTER
+    keep = [
+        len(t) >= 4 and sum(c.isdigit() for c in t) <= len(t) * 0.7
+        for t in texts
+    ]
+    lines = merged.with_texts(texts).filter(keep)
 
     # ================= DEDUPLICATION =================
     seen = set()
     deduped_text = []
-    for line in extracted_text:
+    for line in lines.texts():
         key = line.lower()
         if key not in seen:
             deduped_text.append(line)
             seen.add(key)
 
     full_text = re.sub(r"\s+", " ", " ".join(deduped_text)).strip()
-    aadhaar_text = " ".join(aadhaar_text_lines)
+    aadhaar_text = " ".join(region_lines)
 
     final_text = full_text + " " + aadhaar_text
 
+    return final_text, lines
+
+
+def _profile_passes(route, profile):
+    """(passes to run, fallback allowed) for the profile's pass policy."""
+    if profile["passes"] == "all":
+        return DEFAULT_ROUTE["passes"], False
+    if profile["passes"] == "minimal":
+        return tuple(p for p in route["passes"] if p != "enhanced"), False
+    return route["passes"], True
+
+
+def ocr_on_image(image, progress=None, deadline=None, reader=None,
+                 id_fast_path=None, route=None, triage=None, profile=None):
+    """
+    progress:     optional callback(k, n) called before OCR pass k of n starts
+    deadline:     optional ocr.deadline.Deadline; passes that no longer fit
+                  are skipped and the result is flagged as truncated
+    reader:       optional OCR backend, defaults to get_reader() (for A/B runs)
+    id_fast_path: read only the ID-number lines and skip full-page OCR when
+                  a valid number is found (default: OCR_ID_FAST_PATH)
+    route:        OCR route (see ocr.visual_classifier); default picks one
+                  from the pre-OCR visual classifier
+    triage:       run the cheap quality checks first and refuse unusable
+                  images without OCR (default: OCR_TRIAGE)
+    profile:      speed/accuracy profile name (see ocr.profiles, default:
+                  OCR_PROFILE); reported back as final["profile"]
+    """
+    profile = get_profile(profile)
+
+    if image is None:
+        return {"final": {"text": "", "confidence": 0, "profile": profile["name"]}}
+
+    if isinstance(image, Image.Image):
+        image = np.array(image.convert("RGB"))
+
+    pil_image = Image.fromarray(image).convert("RGB")
+    reader = reader or get_reader()
+
+    # ================= PRE-OCR TRIAGE =================
+    if triage is None:
+        triage = triage_enabled()
+    quality = triage_image(image, reader, _canvas_size(profile)) if triage else None
+    if quality is not None and not quality["ok"]:
+        return {
+            "final": {
+                "text": "",
+                "confidence": 0,
+                "truncated": False,
+                "skipped_passes": [],
+                "triage": quality,
+                "profile": profile["name"]
+            }
+        }
 
-    # ================= CONFIDENCE (HONEST) =================
-    valid_conf = [c for c in confidences if isinstance(c, (int, float))]
-    base_conf = np.mean(valid_conf) if valid_conf else 0
+    # ================= VISUAL ROUTING =================
+    visual = classify_visual(pil_image)
+    if route is None:
+        route = route_for(visual)
+
+    # ================= ORIENTATION & DESKEW =================
+    # The colour-band orientation of a trusted card classification beats
+    # the projection-profile guess; skew always comes from the profiles.
+    # Other pages are only turned with OCR_ORIENTATION=1, and then only
+    # when the detector's line boxes agree (see ocr.orientation).
+    orientation = None
+    mode = orientation_mode()
+    if mode != "0":
+        trusted = visual["trusted"]
+        if trusted:
+            pil_image = correct_orientation(pil_image, visual["orientation"])
+        rotate = mode == "1" and not trusted
+        layout = detect_layout(pil_image, reader) if rotate else None
+        orientation = estimate_orientation(pil_image, layout, rotate=rotate)
+        pil_image = correct_image(pil_image, orientation)
+        if trusted:
+            orientation["rotation"] = visual["orientation"]
+        image = np.array(pil_image)
+
+    # ================= ID-NUMBER FAST PATH =================
+    if id_fast_path is None:
+        id_fast_path = fast_path_enabled() or profile["id_fast_path"]
+    if id_fast_path:
+        fast = _try_id_fast_path(image, reader, deadline, profile)
+        if fast is not None:
+            fast["final"]["triage"] = quality
+            fast["final"]["orientation"] = orientation
+            fast["final"]["profile"] = profile["name"]
+            return fast
 
-    keyword_hits = sum(
-        k in final_text.upper()
-        for k in ["AADHAAR", "UIDAI", "GOVERNMENT", "INDIA"]
+    # ❌ Neutralize extra resize safely
+    pil_image = pil_image.resize(
+        (pil_image.width, pil_image.height),
+        Image.BICUBIC
     )
 
-    if keyword_hits >= 2:
-        base_conf = min(base_conf + 0.12, 0.85)
+    image = np.array(pil_image)
+    names, allow_fallback = _profile_passes(route, profile)
+    passes = _PassTracker(progress, deadline, len(names))
+
+    try:
+        ran = _run_passes(names, route["roi"], pil_image, image, reader, passes, profile)
+    except JobCancelled:
+        raise
+    except Exception:
+        # errored, not empty: never cached (see pipeline._store_ocr)
+        return {"final": {"text": "", "confidence": 0, "profile": profile["name"],
+                          "error": True}}
+
+    if ran is None:
+        return {"final": {"text": "", "confidence": 0, "profile": profile["name"]}}
+
+    region_lines, all_results = ran
+    final_text, lines = _merge_results(all_results, region_lines)
+
+    # ================= LOW-CONFIDENCE FALLBACK =================
+    # The visual guess was wrong, the routed passes missed the ID or the
+    # recognizer was unsure of what it read → run whatever the full
+    # three-pass OCR would have run on top.
+    missing = [p for p in DEFAULT_ROUTE["passes"] if p not in names]
+    line_conf = lines.mean_confidence()
+    fallback = bool(
+        allow_fallback and missing and route["expect"] and (
+            not re.search(route["expect"], final_text.upper()) or
+            (line_conf is not None and line_conf < LOW_LINE_CONFIDENCE)
+        )
+    )
+    if fallback:
+        passes.total += len(missing)
+        try:
+            ran = _run_passes(missing, DEFAULT_ROUTE["roi"], pil_image, image, reader, passes, profile)
+        except JobCancelled:
+            raise
+        except Exception:
+            ran = None
+        if ran is not None:
+            region_lines += ran[0]
+            all_results += ran[1]
+            final_text, lines = _merge_results(all_results, region_lines)
+            line_conf = lines.mean_confidence()
 
     return {
         "final": {
             "text": final_text,
-            "confidence": compute_ocr_confidence(final_text)
+            "confidence": compute_ocr_confidence(final_text, line_conf),
+            "lines": lines,
+            "truncated": bool(passes.skipped),
+            "skipped_passes": passes.skipped,
+            "route": route["name"],
+            "fallback": fallback,
+            "profile": profile["name"],
+            "tiled": tiling_enabled() and needs_tiling(image, _canvas_size(profile)),
+            "scripts": ["latin"] + passes.scripts,
+            "recognition_memo": reader.memo.stats() if hasattr(reader, "memo") else None,
+            "visual": visual,
+            "orientation": orientation,
+            "triage": quality
         }
     }
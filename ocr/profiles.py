@@ -0,0 +1,96 @@
+import os
+
+
+# ===== SPEED / ACCURACY PROFILES =====
+# Every per-request tuning knob lives here, so one name picks a consistent
+# set across rendering (pipeline), preprocessing + passes (ocr_engine) and
+# verification (final_verification):
+#   pdf_scale       pdfium render scale for PDF pages
+#   min_width       pages narrower than this are upscaled before OCR
+#   median_size     median denoise window (0 = off)
+#   brightness / contrast / sharpness
+#                   preprocessing enhancement factors
+#   enhanced        (contrast, sharpness) of the "enhanced" pass
+#   passes          "minimal": routed passes without "enhanced", no fallback
+#                   "routed":  the visual route's passes + low-confidence fallback
+#                   "all":     every pass of the full three-pass OCR
+#   roi_paragraph   paragraph=True grouping for the ROI pass
+#   canvas_size     max side fed to the detector (None = OCR_CANVAS_SIZE)
+#   id_fast_path    try the ID-number fast path first (OCR_ID_FAST_PATH
+#                   still turns it on for every profile)
+#   fuzzy_errors    mismatches allowed in keyword matching
+#   min_ocr_confidence
+#                   below this OCR confidence the result needs review even
+#                   when every field validates (0 = off)
+#
+# Thread counts stay process-wide (ocr.cpu_tuning): torch threads are
+# shared by every concurrent request.
+
+PROFILES = {
+    "fast": {
+        "pdf_scale": 2,
+        "min_width": 700,
+        "median_size": 0,
+        "brightness": 1.03,
+        "contrast": 1.5,
+        "sharpness": 1.25,
+        "enhanced": (1.1, 1.15),
+        "passes": "minimal",
+        "roi_paragraph": True,
+        "canvas_size": 1600,
+        "id_fast_path": True,
+        "fuzzy_errors": 2,
+        "min_ocr_confidence": 0
+    },
+    "balanced": {
+        "pdf_scale": 3,
+        "min_width": 900,
+        "median_size": 3,
+        "brightness": 1.03,
+        "contrast": 1.5,
+        "sharpness": 1.25,
+        "enhanced": (1.1, 1.15),
+        "passes": "routed",
+        "roi_paragraph": True,
+        "canvas_size": None,
+        "id_fast_path": False,
+        "fuzzy_errors": 2,
+        "min_ocr_confidence": 0
+    },
+    "accurate": {
+        "pdf_scale": 4,
+        "min_width": 1200,
+        "median_size": 3,
+        "brightness": 1.03,
+        "contrast": 1.5,
+        "sharpness": 1.25,
+        "enhanced": (1.2, 1.3),
+        "passes": "all",
+        "roi_paragraph": True,
+        "canvas_size": 3200,
+        "id_fast_path": False,
+        "fuzzy_errors": 1,
+        "min_ocr_confidence": 50
+    }
+}
+
+DEFAULT_PROFILE = "balanced"
+
+
+def default_profile_name():
+    return os.environ.get("OCR_PROFILE", DEFAULT_PROFILE).lower()
+
+
+def get_profile(profile=None):
+    """
+    profile: a name from PROFILES, an already resolved profile dict, or
+    None for OCR_PROFILE. Returns the dict with its "name" filled in.
+    """
+    if isinstance(profile, dict):
+        return profile
+    name = (profile or default_profile_name()).lower()
+    if name not in PROFILES:
+        raise ValueError(
+            f"Unknown OCR profile '{name}' (choose from {', '.join(PROFILES)})"
+        )
+    return {"name": name, **PROFILES[name]}
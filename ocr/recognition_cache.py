@@ -0,0 +1,187 @@
+import math
+import os
+import re
+import threading
+from collections import OrderedDict
+
+import numpy as np
+from PIL import Image
+
+from ocr.backends.base import OCRBackend
+
+
+# ===== LINE-CROP RECOGNITION MEMO =====
+# Every Aadhaar card prints "Government of India" / "Unique Identification
+# Authority of India", every PAN card "INCOME TAX DEPARTMENT". Instead of
+# decoding those crops again for each document, recognized lines are
+# memoized under a perceptual hash of the normalized crop:
+#   * crop → grayscale, trimmed to its ink, box-averaged to HASH_H × HASH_W,
+#     one bit per cell (darker than the line mean)
+#   * lookup: exact key only by default; OCR_MEMO_DISTANCE (at most
+#     MAX_NEAR_DISTANCE) also accepts the closest stored hash within that
+#     many bits (same allowlist, neighbouring aspect bucket)
+#   * LRU eviction at CACHE_SIZE entries
+# Only confident readings of known boilerplate (BOILERPLATE: card headers
+# and field labels) are stored, so a name, number or address line can
+# never be served from cache, even when its crop hashes close to a header.
+#
+# Off by default; OCR_RECOGNITION_MEMO=1 turns it on.
+
+HASH_W = 64
+HASH_H = 16
+# of 1024 bits; capped well below the distance between different words
+MAX_NEAR_DISTANCE = 32
+MAX_DISTANCE = min(int(os.environ.get("OCR_MEMO_DISTANCE", "0")), MAX_NEAR_DISTANCE)
+CACHE_SIZE = int(os.environ.get("OCR_MEMO_SIZE", "256"))
+MIN_STORE_CONF = 0.85
+
+# upper-cased, letters and single spaces only (see _phrase)
+BOILERPLATE = frozenset({
+    "GOVERNMENT OF INDIA",
+    "GOVT OF INDIA",
+    "UNIQUE IDENTIFICATION AUTHORITY OF INDIA",
+    "INCOME TAX DEPARTMENT",
+    "PERMANENT ACCOUNT NUMBER",
+    "PERMANENT ACCOUNT NUMBER CARD",
+    "AADHAAR AAM AADMI KA ADHIKAR",
+    "MERA AADHAAR MERI PEHCHAN",
+    "YOUR AADHAAR NO",
+    "ENROLMENT NO",
+    "DATE OF BIRTH",
+    "FATHERS NAME",
+    "SIGNATURE"
+})
+
+
+def memo_enabled():
+    return os.environ.get("OCR_RECOGNITION_MEMO", "0") == "1"
+
+
+def _ink_box(gray):
+    """Trim the padding detectors add around a line (it varies per scan)."""
+    ink = gray < (int(gray.min()) + int(gray.max())) // 2
+    rows, cols = np.nonzero(ink.any(axis=1))[0], np.nonzero(ink.any(axis=0))[0]
+    if len(rows) == 0:
+        return gray
+    return gray[rows[0]:rows[-1] + 1, cols[0]:cols[-1] + 1]
+
+
+def crop_hash(crop):
+    """(aspect bucket, 1024-bit average hash as int) of a line crop."""
+    image = Image.fromarray(crop.astype(np.uint8)).convert("L")
+    gray = _ink_box(np.asarray(image))
+    h, w = gray.shape
+    aspect = round(4 * math.log2(max(w, 1) / max(h, 1)))
+
+    # box-averaged cells wash out scan noise; each cell vs the line mean
+    small = np.asarray(
+        Image.fromarray(gray).resize((HASH_W, HASH_H), Image.BOX), dtype=np.float32
+    )
+    bits = (small < small.mean()).ravel()
+    return aspect, int.from_bytes(np.packbits(bits).tobytes(), "big")
+
+
+def _phrase(text):
+    return " ".join(re.sub(r"[^A-Z ]", "", text.upper()).split())
+
+
+def _storable(text, conf):
+    return conf >= MIN_STORE_CONF and _phrase(text) in BOILERPLATE
+
+
+class RecognitionMemo:
+    """Thread-safe LRU of (allowlist, aspect, hash) → (text, conf)."""
+
+    def __init__(self, size=CACHE_SIZE, max_distance=MAX_DISTANCE):
+        self.size = size
+        self.max_distance = max_distance
+        self.entries = OrderedDict()
+        self.hits = 0
+        self.near_hits = 0
+        self.misses = 0
+        self.lock = threading.Lock()
+
+    def get(self, allowlist, key):
+        aspect, bits = key
+        with self.lock:
+            exact = (allowlist, aspect, bits)
+            if exact in self.entries:
+                self.entries.move_to_end(exact)
+                self.hits += 1
+                return self.entries[exact]
+            if not self.max_distance:
+                self.misses += 1
+                return None
+
+            best, best_dist = None, self.max_distance + 1
+            for stored in self.entries:
+                if stored[0] != allowlist or abs(stored[1] - aspect) > 1:
+                    continue
+                dist = bin(stored[2] ^ bits).count("1")
+                if dist < best_dist:
+                    best, best_dist = stored, dist
+
+            if best is None:
+                self.misses += 1
+                return None
+            self.entries.move_to_end(best)
+            self.hits += 1
+            self.near_hits += 1
+            return self.entries[best]
+
+    def put(self, allowlist, key, text, conf):
+        if not _storable(text, conf):
+            return
+        with self.lock:
+            self.entries[(allowlist, key[0], key[1])] = (text, conf)
+            self.entries.move_to_end((allowlist, key[0], key[1]))
+            while len(self.entries) > self.size:
+                self.entries.popitem(last=False)
+
+    def stats(self):
+        with self.lock:
+            lookups = self.hits + self.misses
+            return {
+                "hits": self.hits,
+                "near_hits": self.near_hits,
+                "misses": self.misses,
+                "hit_rate": round(self.hits / lookups, 3) if lookups else 0.0,
+                "entries": len(self.entries)
+            }
+
+
+class MemoBackend(OCRBackend):
+    """
+    Wraps a backend so recognize() consults the memo first and only the
+    missing crops reach the real recognizer. readtext() is the composed
+    detect → recognize path from OCRBackend, so it benefits too.
+    """
+
+    def __init__(self, backend, memo=None):
+        self.backend = backend
+        self.memo = memo or RecognitionMemo()
+        self.name = backend.name
+
+    def __getattr__(self, attr):
+        # reader, sessions, ... of the wrapped backend
+        if attr == "backend":
+            raise AttributeError(attr)
+        return getattr(self.backend, attr)
+
+    def detect(self, image, canvas_size=2560):
+        return self.backend.detect(image, canvas_size=canvas_size)
+
+    def detect_batch(self, images, canvas_size=2560):
+        return self.backend.detect_batch(images, canvas_size=canvas_size)
+
+    def recognize(self, crops, allowlist=None):
+        keys = [crop_hash(crop) for crop in crops]
+        out = [self.memo.get(allowlist, key) for key in keys]
+
+        missing = [i for i, hit in enumerate(out) if hit is None]
+        if missing:
+            fresh = self.backend.recognize([crops[i] for i in missing], allowlist=allowlist)
+            for i, (text, conf) in zip(missing, fresh):
+                out[i] = (text, conf)
+                self.memo.put(allowlist, keys[i], text, conf)
+        return out
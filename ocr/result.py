@@ -0,0 +1,147 @@
+from collections import namedtuple
+from numbers import Real
+
+import numpy as np
+
+
+# ===== COLUMNAR OCR RESULT =====
+# OCR lines as three flat arrays instead of a list of (box, text, conf)
+# tuples:
+#   boxes    float32 (N, 4, 2)   tl, tr, br, bl
+#   conf     float32 (N,)
+#   offsets  int64   (N + 1,)    line i is buffer[offsets[i]:offsets[i+1]-1]
+# Texts live in one "\n"-joined buffer, so the page text is a single
+# replace() away and filter / sort / select are index operations on the
+# arrays. Iterating still yields (box, text, conf), so tuple-style callers
+# keep working.
+
+Line = namedtuple("Line", ["box", "text", "conf"])
+SEPARATOR = "\n"
+
+
+class OCRLines:
+
+    __slots__ = ("boxes", "conf", "offsets", "buffer")
+
+    def __init__(self, boxes, conf, offsets, buffer):
+        self.boxes = boxes
+        self.conf = conf
+        self.offsets = offsets
+        self.buffer = buffer
+
+    # ---------------- construction ----------------
+    @classmethod
+    def empty(cls):
+        return cls(
+            np.zeros((0, 4, 2), np.float32),
+            np.zeros(0, np.float32),
+            np.zeros(1, np.int64),
+            ""
+        )
+
+    @classmethod
+    def from_results(cls, results, default_conf=0.6):
+        """
+        (box, text, conf) or paragraph-style (box, text) items; anything
+        else (or a non-string text) is dropped.
+        """
+        boxes, texts, confs = [], [], []
+        for item in results:
+            if len(item) == 3:
+                box, text, conf = item
+            elif len(item) == 2:
+                (box, text), conf = item, default_conf
+            else:
+                continue
+            if not isinstance(text, str) or not isinstance(conf, Real):
+                continue
+            boxes.append(box)
+            texts.append(text.replace(SEPARATOR, " "))
+            confs.append(conf)
+
+        if not texts:
+            return cls.empty()
+
+        return cls(
+            np.asarray(boxes, np.float32).reshape(-1, 4, 2),
+            np.asarray(confs, np.float32),
+            _starts_to_offsets(texts),
+            SEPARATOR.join(texts)
+        )
+
+    # ---------------- per-line views ----------------
+    def __len__(self):
+        return len(self.conf)
+
+    def text_at(self, i):
+        return self.buffer[self.offsets[i]:self.offsets[i + 1] - 1]
+
+    def __getitem__(self, i):
+        return Line(self.boxes[i], self.text_at(i), float(self.conf[i]))
+
+    def __iter__(self):
+        for i in range(len(self)):
+            yield self[i]
+
+    def texts(self):
+        return self.buffer.split(SEPARATOR) if len(self) else []
+
+    def joined(self, sep=" "):
+        return self.buffer.replace(SEPARATOR, sep)
+
+    # ---------------- vectorized geometry ----------------
+    def bounds(self):
+        """(N, 4) x0, y0, x1, y1."""
+        return np.concatenate([self.boxes.min(axis=1), self.boxes.max(axis=1)], axis=1)
+
+    def heights(self):
+        return np.ptp(self.boxes[:, :, 1], axis=1)
+
+    def mean_confidence(self):
+        return float(self.conf.mean()) if len(self) else None
+
+    # ---------------- filter / sort / select ----------------
+    def select(self, indices):
+        """New OCRLines with the given lines, in the given order."""
+        indices = np.asarray(indices, np.int64)
+        if len(indices) == 0:
+            return OCRLines.empty()
+        texts = self.texts()
+        return OCRLines(
+            self.boxes[indices],
+            self.conf[indices],
+            _starts_to_offsets([texts[i] for i in indices]),
+            SEPARATOR.join(texts[i] for i in indices)
+        )
+
+    def with_texts(self, texts):
+        """Same geometry / confidences, new texts (e.g. normalized)."""
+        texts = [t.replace(SEPARATOR, " ") for t in texts]
+        return OCRLines(self.boxes, self.conf, _starts_to_offsets(texts), SEPARATOR.join(texts))
+
+    def filter(self, mask):
+        return self.select(np.flatnonzero(mask))
+
+    def by_confidence(self):
+        """Indices, most confident first (stable)."""
+        return np.argsort(-self.conf, kind="stable")
+
+    def reading_order(self):
+        """Top-to-bottom lines, left-to-right within a line."""
+        if len(self) == 0:
+            return self
+        b = self.bounds()
+        line_h = max(float(np.median(b[:, 3] - b[:, 1])), 1.0)
+        rows = np.round(b[:, 1] / (line_h * 0.6))
+        return self.select(np.lexsort((b[:, 0], rows)))
+
+    def to_tuples(self):
+        return [(box.tolist(), text, conf) for box, text, conf in self]
+
+
+def _starts_to_offsets(texts):
+    """offsets[i] = start of line i; offsets[N] = len(buffer) + 1."""
+    offsets = np.zeros(len(texts) + 1, np.int64)
+    if texts:
+        np.cumsum([len(t) + 1 for t in texts], out=offsets[1:])
+    return offsets
@@ -0,0 +1,157 @@
+import os
+import threading
+from collections import OrderedDict, deque
+
+from ocr.cpu_tuning import thread_settings
+
+
+# ===== ADMISSION CONTROL =====
+# Every Streamlit session shares one EasyOCR reader. Running many torch
+# inferences at once only makes all of them slower, so OCR work goes
+# through a single process-wide scheduler:
+#   * at most OCR_MAX_CONCURRENT documents are in OCR at a time
+#     (auto-tuned from the core count, see ocr/cpu_tuning.py)
+#   * waiting documents are served round-robin across sessions,
+#     FIFO within a session (one busy user can't starve the others)
+#   * when more than OCR_MAX_QUEUE documents are waiting, new work is
+#     rejected immediately instead of piling up latency
+
+
+class SchedulerBusy(Exception):
+    pass
+
+
+class Ticket:
+    def __init__(self, scheduler, session_id):
+        self.scheduler = scheduler
+        self.session_id = session_id
+        self.granted = False
+        self.released = False
+
+    def position(self):
+        """0 = running, 1 = next in line, ..."""
+        return self.scheduler.position(self)
+
+    def wait(self):
+        self.scheduler.wait(self)
+
+    def release(self):
+        self.scheduler.release(self)
+
+    def __enter__(self):
+        self.wait()
+        return self
+
+    def __exit__(self, *exc):
+        self.release()
+        return False
+
+
+class OCRScheduler:
+    def __init__(self, max_concurrent=None, max_queue=None):
+        if max_concurrent is None:
+            max_concurrent = thread_settings()["max_concurrent"]
+        if max_queue is None:
+            max_queue = int(os.environ.get("OCR_MAX_QUEUE", "16"))
+
+        self.max_concurrent = max(1, max_concurrent)
+        self.max_queue = max(0, max_queue)
+
+        self._cond = threading.Condition()
+        self._running = 0
+        # session_id → deque of waiting tickets; order = round-robin order
+        self._waiting = OrderedDict()
+
+    # ---------------- QUEUE ----------------
+    def enqueue(self, session_id):
+        with self._cond:
+            if self._waiting_count() >= self.max_queue:
+                raise SchedulerBusy(
+                    "OCR service is busy, please retry in a moment"
+                )
+            ticket = Ticket(self, session_id)
+            self._waiting.setdefault(session_id, deque()).append(ticket)
+            self._dispatch()
+            return ticket
+
+    def _waiting_count(self):
+        return sum(len(q) for q in self._waiting.values())
+
+    def _dispatch(self):
+        while self._running < self.max_concurrent and self._waiting:
+            session_id, queue = next(iter(self._waiting.items()))
+            ticket = queue.popleft()
+
+            # Served session moves to the back of the round-robin order
+            del self._waiting[session_id]
+            if queue:
+                self._waiting[session_id] = queue
+
+            ticket.granted = True
+            self._running += 1
+
+        self._cond.notify_all()
+
+    def _service_order(self):
+        queues = [list(q) for q in self._waiting.values()]
+        order = []
+        depth = 0
+        while True:
+            row = [q[depth] for q in queues if depth < len(q)]
+            if not row:
+                return order
+            order.extend(row)
+            depth += 1
+
+    # ---------------- TICKETS ----------------
+    def position(self, ticket):
+        with self._cond:
+            if ticket.granted or ticket.released:
+                return 0
+            try:
+                return self._service_order().index(ticket) + 1
+            except ValueError:
+                return 0
+
+    def wait(self, ticket):
+        with self._cond:
+            while not ticket.granted:
+                self._cond.wait()
+
+    def release(self, ticket):
+        with self._cond:
+            if ticket.released:
+                return
+            ticket.released = True
+
+            if ticket.granted:
+                self._running -= 1
+            else:
+                queue = self._waiting.get(ticket.session_id)
+                if queue and ticket in queue:
+                    queue.remove(ticket)
+                    if not queue:
+                        del self._waiting[ticket.session_id]
+
+            self._dispatch()
+
+    def stats(self):
+        with self._cond:
+            return {
+                "running": self._running,
+                "waiting": self._waiting_count(),
+                "max_concurrent": self.max_concurrent,
+                "max_queue": self.max_queue
+            }
+
+
+_scheduler = None
+_scheduler_lock = threading.Lock()
+
+
+def get_scheduler():
+    global _scheduler
+    with _scheduler_lock:
+        if _scheduler is None:
+            _scheduler = OCRScheduler()
+        return _scheduler
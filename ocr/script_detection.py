@@ -0,0 +1,79 @@
+import os
+
+import numpy as np
+from PIL import Image
+
+from ocr.backends.base import crop_box
+
+
+# ===== SCRIPT DETECTION (DEVANAGARI / LATIN) =====
+# Aadhaar cards print Hindi (or a regional language) next to English. The
+# English reader turns those lines into garbage, but loading a Hindi
+# reader for every page would double memory and startup for English-only
+# traffic. Devanagari is easy to spot without a model: each word hangs
+# from a continuous headline (shirorekha), so one row in the upper half of
+# the line crop is almost solid ink across the word — Latin capitals and
+# lowercase never come close.
+
+LINE_HEIGHT = 32                 # crops are normalized to this height
+HEADLINE_DENSITY = 0.7           # ink fraction of the headline row
+HEADLINE_CONTRAST = 2.0          # headline row vs median ink row
+MIN_SCRIPT_LINES = 1
+
+# script → EasyOCR language codes loaded for it (English rides along)
+SCRIPT_LANGS = {
+    "devanagari": ("hi", "en")
+}
+
+
+def extra_scripts_enabled():
+    return os.environ.get("OCR_EXTRA_SCRIPTS", "1") != "0"
+
+
+def _ink(crop):
+    gray = Image.fromarray(crop.astype(np.uint8)).convert("L")
+    w, h = gray.size
+    gray = gray.resize((max(1, round(w * LINE_HEIGHT / max(h, 1))), LINE_HEIGHT))
+    g = np.asarray(gray, dtype=np.float32)
+    return g < (g.min() + g.max()) / 2
+
+
+def headline_score(crop):
+    """Ink density of the strongest upper-half row / median ink row."""
+    ink = _ink(crop)
+    cols = np.flatnonzero(ink.any(axis=0))
+    if len(cols) < 4:
+        return 0.0, 0.0
+    ink = ink[:, cols[0]:cols[-1] + 1]
+
+    rows = ink.mean(axis=1)
+    upper = rows[: int(LINE_HEIGHT * 0.55)]
+    peak = float(upper.max())
+    body = float(np.median(rows[rows > 0])) if (rows > 0).any() else 0.0
+    return peak, peak / max(body, 1e-6)
+
+
+def detect_script(crop):
+    density, contrast = headline_score(crop)
+    if density >= HEADLINE_DENSITY and contrast >= HEADLINE_CONTRAST:
+        return "devanagari"
+    return "latin"
+
+
+def non_latin_boxes(image, results):
+    """
+    {script: [box, ...]} for detail=1 results whose crops look non-Latin.
+    Only crops the reader was unsure about are checked: a confident
+    English reading is English.
+    """
+    found = {}
+    for box, _text, conf in results:
+        if conf >= 0.8:
+            continue
+        crop = crop_box(image, box)
+        if crop is None or crop.shape[0] < 8:
+            continue
+        script = detect_script(crop)
+        if script != "latin":
+            found.setdefault(script, []).append(box)
+    return {s: boxes for s, boxes in found.items() if len(boxes) >= MIN_SCRIPT_LINES}
@@ -0,0 +1,101 @@
+import sys
+import threading
+import weakref
+from collections import namedtuple
+from contextlib import contextmanager
+from multiprocessing import shared_memory
+
+import numpy as np
+
+
+# ===== SHARED-MEMORY PAGE TRANSPORT =====
+# Pickling a 3000×2400 RGB page to a worker process copies ~22 MB through
+# a pipe twice (serialize + deserialize). Instead the page is written once
+# into a multiprocessing.shared_memory segment and only a tiny handle
+# (segment name, shape, dtype) crosses the process boundary; the worker
+# maps the same pages read-only.
+#
+# Lifecycle: the owning process creates and unlinks segments
+# (SharedPages.release / close / garbage collection); workers only attach
+# and close their mapping.
+
+PageHandle = namedtuple("PageHandle", ["name", "shape", "dtype"])
+
+
+def _unlink_all(segments):
+    for shm in segments.values():
+        try:
+            shm.close()
+            shm.unlink()
+        except FileNotFoundError:
+            pass
+    segments.clear()
+
+
+class SharedPages:
+    """
+    Owner side: share(array) → PageHandle, release(handle) once the
+    worker's result is back. Use as a context manager so every segment
+    of a document is freed even when OCR fails half way.
+    """
+
+    def __init__(self):
+        self._segments = {}
+        self._lock = threading.Lock()
+        # last line of defence if close() is never reached
+        self._finalizer = weakref.finalize(self, _unlink_all, self._segments)
+
+    def share(self, array):
+        array = np.ascontiguousarray(array)
+        shm = shared_memory.SharedMemory(create=True, size=max(array.nbytes, 1))
+        np.ndarray(array.shape, array.dtype, buffer=shm.buf)[...] = array
+        with self._lock:
+            self._segments[shm.name] = shm
+        return PageHandle(shm.name, array.shape, array.dtype.str)
+
+    def release(self, handle):
+        with self._lock:
+            shm = self._segments.pop(handle.name, None)
+        if shm is not None:
+            shm.close()
+            shm.unlink()
+
+    def close(self):
+        with self._lock:
+            _unlink_all(self._segments)
+
+    def __len__(self):
+        return len(self._segments)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+        return False
+
+
+def _attach(name):
+    if sys.version_info >= (3, 13):
+        return shared_memory.SharedMemory(name=name, track=False)
+    # Older Pythons register the attach with the resource tracker, which
+    # multiprocessing children share with the owner: the owner's unlink
+    # clears that registration again.
+    return shared_memory.SharedMemory(name=name)
+
+
+@contextmanager
+def attached(handle):
+    """Worker side: read-only view of a shared page, valid inside the block."""
+    shm = _attach(handle.name)
+    view = np.ndarray(handle.shape, np.dtype(handle.dtype), buffer=shm.buf)
+    view.flags.writeable = False
+    try:
+        yield view
+    finally:
+        del view
+        try:
+            shm.close()
+        except BufferError:
+            # a caller still holds a view; the mapping goes with it
+            pass
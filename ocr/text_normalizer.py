@@ -0,0 +1,237 @@
+import hashlib
+import os
+import re
+import unicodedata
+
+
+# ===== COMPILED TEXT NORMALIZER =====
+# One regex pass per text instead of one str.replace per correction plus
+# separate filter / whitespace passes:
+#   * the correction table is compiled into a single prefix-factored
+#     alternation (a trie), so matching costs the length of the longest
+#     key, not the number of keys — thousands of corrections stay cheap
+#   * every other alphanumeric token goes through the OCR confusion table,
+#     scoped by token type (words, PAN-shaped IDs); letters read inside a
+#     number only become digits in a numeric field (a PIN or year of birth
+#     after its label, Aadhaar 4-digit groups, dates) — "Flat 101B" is an
+#     address, not a misread number
+#   * runs of disallowed characters and whitespace collapse to one space
+# NFKC (and upper-casing for verification) run first, at C speed.
+#
+# OCR_CORRECTIONS_FILE adds corrections from a tab-separated
+# "wrong<TAB>right" file; OCR_CONFUSION_FIX=0 turns the token-type
+# confusion correction off.
+
+# bump when the table / confusion rules change (see utils/stage_cache.py)
+NORMALIZER_VERSION = 2
+
+CORRECTIONS = {
+    "1ndia": "India",
+    "1dentification": "Identification",
+    "MA1E": "MALE",
+    "FEMA1E": "FEMALE",
+    "P1N": "PIN",
+    "5ub": "Sub",
+    "Disuict": "District",
+    "Govemment": "Government"
+}
+
+# letter read where a digit belongs (numeric tokens, PAN digit positions)
+DIGIT_FOR = {"O": "0", "o": "0", "D": "0", "I": "1", "l": "1",
+             "S": "5", "s": "5", "B": "8", "Z": "2"}
+# digit read where a letter belongs (words, PAN letter positions)
+LETTER_FOR = {"0": "O", "1": "I", "5": "S", "8": "B"}
+LOWER_LETTER_FOR = {"0": "o", "1": "l", "5": "s", "8": "B"}
+
+_TO_DIGIT = str.maketrans(DIGIT_FOR)
+_TO_LETTER = str.maketrans(LETTER_FOR)
+_TO_LOWER_LETTER = str.maketrans(LOWER_LETTER_FOR)
+
+_ASCII_DIGITS = frozenset("0123456789")
+_ORDINAL = re.compile(r"\d+(?:st|nd|rd|th|ST|ND|RD|TH)")
+_PAN_LETTER = "[A-Z" + "".join(LETTER_FOR) + "]"
+_PAN_DIGIT = "[0-9" + "".join(k for k in DIGIT_FOR if k.isupper()) + "]"
+_PAN_SHAPE = re.compile(f"{_PAN_LETTER}{{5}}{_PAN_DIGIT}{{4}}{_PAN_LETTER}")
+
+# numeric fields whose tokens may have letters read for digits
+_D = "[0-9" + "".join(DIGIT_FOR) + "]"
+_NUMERIC_FIELD = re.compile(
+    # PIN code after its label
+    rf"(?i:\bP[I1l]N(?:\s*CODE)?)\s*[:\-]?\s*(?P<pin>{_D}{{6}}|{_D}{{3}}\s+{_D}{{3}})\b"
+    # Aadhaar number: three 4-digit groups
+    rf"|\b(?P<aadhaar>{_D}{{4}}\s+{_D}{{4}}\s+{_D}{{4}})\b"
+    # year of birth after its label (cards that print no full date)
+    rf"|(?i:\b(?:YEAR\s+OF\s+BIRTH|YOB))\s*[:\-]?\s*(?P<year>{_D}{{4}})\b"
+    # dates: dd/mm/yyyy, dd-mm-yy, dd.mm.yyyy
+    rf"|\b(?P<date>{_D}{{1,2}}(?P<sep>[/\-.]){_D}{{1,2}}(?P=sep)(?:{_D}{{4}}|{_D}{{2}}))\b"
+)
+
+
+def confusion_fix_enabled():
+    return os.environ.get("OCR_CONFUSION_FIX", "1") != "0"
+
+
+def load_corrections(path):
+    """{wrong: right} from a tab-separated file; '#' starts a comment."""
+    table = {}
+    with open(path, encoding="utf-8") as f:
+        for line in f:
+            line = line.rstrip("\n")
+            if not line or line.startswith("#") or "\t" not in line:
+                continue
+            wrong, right = line.split("\t", 1)
+            if wrong:
+                table[wrong] = right
+    return table
+
+
+def _trie_pattern(words):
+    """Alternation matching any of `words`, longest first, prefixes shared."""
+    trie = {}
+    for word in words:
+        node = trie
+        for ch in word:
+            node = node.setdefault(ch, {})
+        node[""] = {}
+
+    def build(node):
+        end = "" in node
+        branches = [re.escape(ch) + build(child)
+                    for ch, child in sorted(node.items()) if ch]
+        if not branches:
+            return ""
+        body = branches[0] if len(branches) == 1 else "(?:" + "|".join(branches) + ")"
+        if end:
+            # the longer match is tried first, the bare prefix is the fallback
+            return "(?:" + body + ")?"
+        return body
+
+    return build(trie)
+
+
+def numeric_spans(text):
+    """(start, end) of the numeric fields in `text` (see _NUMERIC_FIELD)."""
+    spans = []
+    for m in _NUMERIC_FIELD.finditer(text):
+        kind = next(k for k in ("pin", "aadhaar", "year", "date") if m.group(k))
+        value = m.group(kind)
+        digits = sum(c in _ASCII_DIGITS for c in value)
+        # mostly digits already: a run of words is not a number
+        if digits * 2 > sum(c.isalnum() for c in value):
+            spans.append(m.span(kind))
+    return spans
+
+
+def fix_confusions(token, numeric=False):
+    """
+    O↔0, I↔1, S↔5, B↔8 by token type: tokens of a numeric field
+    (numeric=True) become numbers, mostly-letter words become letters,
+    PAN-shaped tokens are fixed per position. Anything else — house / flat
+    numbers like 101B included — is left alone.
+    """
+    if numeric:
+        if all(c in _ASCII_DIGITS or c in DIGIT_FOR for c in token):
+            return token.translate(_TO_DIGIT)
+        return token
+
+    if token.isalpha() or token.isdigit() or len(token) < 3:
+        return token
+
+    if len(token) == 10 and _PAN_SHAPE.fullmatch(token):
+        return (
+            token[:5].translate(_TO_LETTER) +
+            token[5:9].translate(_TO_DIGIT) +
+            token[9].translate(_TO_LETTER)
+        )
+
+    digits = sum(c in _ASCII_DIGITS for c in token)
+    letters = len(token) - digits
+    if not digits or _ORDINAL.fullmatch(token):
+        return token
+
+    if digits * 3 <= letters:
+        if all(c not in _ASCII_DIGITS or c in LETTER_FOR for c in token):
+            lower = sum(c.islower() for c in token) > letters // 2
+            return token.translate(_TO_LOWER_LETTER if lower else _TO_LETTER)
+
+    return token
+
+
+class Normalizer:
+    """
+    corrections: {wrong: right}, applied where a token starts
+    token:       regex of the tokens the confusion table applies to
+    drop:        regex of a character replaced by a space (whitespace
+                 always is); runs of both collapse to one space
+    upper:       upper-case before matching (the table is upper-cased too)
+    """
+
+    def __init__(self, corrections, token, drop, upper=False, confusions=None):
+        if upper:
+            corrections = {k.upper(): v.upper() for k, v in corrections.items()}
+        self.corrections = {k: v for k, v in corrections.items() if k}
+        self.upper = upper
+        self.confusions = confusion_fix_enabled() if confusions is None else confusions
+        self.digest = hashlib.sha256(
+            repr(sorted(self.corrections.items())).encode("utf-8")
+        ).hexdigest()[:16]
+
+        parts = []
+        if self.corrections:
+            parts.append(f"(?P<fix>{_trie_pattern(self.corrections)})")
+        parts.append(f"(?P<tok>{token})")
+        parts.append(f"(?P<drop>(?:{drop}|\\s)+)")
+        self.pattern = re.compile("|".join(parts))
+
+    def _replace(self, m, spans):
+        kind = m.lastgroup
+        if kind == "fix":
+            return self.corrections[m.group()]
+        if kind == "tok":
+            if not self.confusions:
+                return m.group()
+            start, end = m.span()
+            numeric = any(a <= start and end <= b for a, b in spans)
+            return fix_confusions(m.group(), numeric)
+        return " "
+
+    def __call__(self, text):
+        if not text:
+            return ""
+        text = unicodedata.normalize("NFKC", text)
+        if self.upper:
+            text = text.upper()
+        spans = numeric_spans(text) if self.confusions else ()
+        return self.pattern.sub(lambda m: self._replace(m, spans), text).strip()
+
+
+def _corrections():
+    table = dict(CORRECTIONS)
+    path = os.environ.get("OCR_CORRECTIONS_FILE")
+    if path:
+        table.update(load_corrections(path))
+    return table
+
+
+# OCR lines: keep case, the punctuation fields use (: / - .) and
+# Devanagari vowel signs (not \w) from the extra-script readers
+normalize_ocr_line = Normalizer(
+    _corrections(), token=r"[^\W_]+", drop=r"[^\w\s:/\-\.\u0900-\u097F]"
+)
+
+# verification text: upper-case A-Z / 0-9 words only
+normalize_for_matching = Normalizer(
+    _corrections(), token=r"[A-Z0-9]+", drop=r"[^A-Z0-9]", upper=True
+)
+
+
+def normalizer_settings():
+    """
+    What the normalizers were built with besides NORMALIZER_VERSION: the
+    confusion toggle and the correction table (OCR_CORRECTIONS_FILE
+    included). Part of the OCR and text stage-cache keys.
+    """
+    return (
+        ("confusion_fix", normalize_ocr_line.confusions),
+        ("corrections", normalize_ocr_line.digest)
+    )
@@ -0,0 +1,153 @@
+import os
+from concurrent.futures import ThreadPoolExecutor
+
+from ocr.backends.base import box_bounds
+from ocr.merge import box_overlap
+
+
+# ===== TILED OCR =====
+# A 300 DPI A4 scan or a 3x rendered PDF page is ~2500×3500 px. Passed
+# whole, the detector either works on the full area (memory/latency grow
+# with it) or squeezes it into canvas_size and loses small print. Pages
+# larger than canvas_size are cut into overlapping tiles instead; every tile is a numpy
+# *view* (no copy) and the detector only ever sees TILE_SIZE² pixels.
+# Lines cut by an inner seam are dropped in favour of the copy the
+# neighbouring tile saw whole; lines longer than the overlap (cut in every
+# tile) are read once more from a strip over their fragments.
+
+TILE_SIZE = int(os.environ.get("OCR_TILE_SIZE", "1600"))
+TILE_OVERLAP = int(os.environ.get("OCR_TILE_OVERLAP", "200"))
+TILE_WORKERS = int(os.environ.get("OCR_TILE_WORKERS", "1"))
+SEAM_MARGIN = 4
+DUPLICATE_IOU = 0.3
+CONTAINED = 0.7
+
+
+def tiling_enabled():
+    return os.environ.get("OCR_TILING", "1") != "0"
+
+
+def needs_tiling(image, canvas_size):
+    """Only pages the detector would shrink to fit its canvas are tiled."""
+    h, w = image.shape[:2]
+    return max(h, w) > canvas_size
+
+
+def _starts(length, tile, overlap):
+    if length <= tile:
+        return [0]
+    step = tile - overlap
+    starts = list(range(0, length - tile, step))
+    starts.append(length - tile)
+    return starts
+
+
+def tile_grid(width, height, tile=TILE_SIZE, overlap=TILE_OVERLAP):
+    """(x0, y0, x1, y1) tiles covering the page, overlapping by `overlap`."""
+    return [
+        (x, y, min(x + tile, width), min(y + tile, height))
+        for y in _starts(height, tile, overlap)
+        for x in _starts(width, tile, overlap)
+    ]
+
+
+def _offset(box, dx, dy):
+    return [[p[0] + dx, p[1] + dy] for p in box]
+
+
+def _touches_seam(bounds, tile, width, height):
+    x0, y0, x1, y1 = bounds
+    tx0, ty0, tx1, ty1 = tile
+    return (
+        (tx0 > 0 and x0 <= tx0 + SEAM_MARGIN) or
+        (ty0 > 0 and y0 <= ty0 + SEAM_MARGIN) or
+        (tx1 < width and x1 >= tx1 - SEAM_MARGIN) or
+        (ty1 < height and y1 >= ty1 - SEAM_MARGIN)
+    )
+
+
+def _group(candidates):
+    """Clusters of candidates that are the same line seen by several tiles."""
+    groups = []
+    for cand in candidates:
+        bounds = box_bounds(cand[0])
+        for group in groups:
+            iou, contained = box_overlap(bounds, group["bounds"])
+            if iou >= DUPLICATE_IOU or contained >= CONTAINED or (
+                # fragments of one seam-crossing line: same row, touching
+                cand[3] and group["cut"] and _same_line(bounds, group["bounds"])
+            ):
+                group["members"].append(cand)
+                g = group["bounds"]
+                group["bounds"] = (
+                    min(g[0], bounds[0]), min(g[1], bounds[1]),
+                    max(g[2], bounds[2]), max(g[3], bounds[3])
+                )
+                group["cut"] = group["cut"] and cand[3]
+                break
+        else:
+            groups.append({"bounds": bounds, "members": [cand], "cut": cand[3]})
+    return groups
+
+
+def _same_line(a, b):
+    iy = min(a[3], b[3]) - max(a[1], b[1])
+    ix = min(a[2], b[2]) - max(a[0], b[0])
+    return iy > 0.5 * min(a[3] - a[1], b[3] - b[1]) and ix >= -SEAM_MARGIN
+
+
+def merge_tile_results(candidates, reread=None):
+    """
+    candidates: (box, text, conf, cut_by_seam) in page coordinates.
+    A line some tile saw whole wins (highest confidence first). A line
+    every tile saw cut is read again from the page over the union of its
+    fragments via reread(bounds) -> [(box, text, conf)], when given.
+    """
+    merged = []
+    for group in _group(sorted(candidates, key=lambda c: (c[3], -c[2]))):
+        whole = [c for c in group["members"] if not c[3]]
+        if whole:
+            box, text, conf, _ = max(whole, key=lambda c: c[2])
+            merged.append((box, text, conf))
+        elif reread is not None and len(group["members"]) > 1:
+            merged.extend(reread(group["bounds"]))
+        else:
+            box, text, conf, _ = max(group["members"], key=lambda c: len(c[1]))
+            merged.append((box, text, conf))
+    return merged
+
+
+def readtext_tiled(reader, image, tile_size=TILE_SIZE, overlap=TILE_OVERLAP,
+                   workers=TILE_WORKERS, **kwargs):
+    """
+    Drop-in for reader.readtext(image, detail=1, ...) on large pages.
+    """
+    h, w = image.shape[:2]
+    tiles = tile_grid(w, h, tile_size, overlap)
+
+    def run(tile):
+        x0, y0, x1, y1 = tile
+        results = reader.readtext(image[y0:y1, x0:x1], detail=1, **kwargs)
+        out = []
+        for box, text, conf in results:
+            box = _offset(box, x0, y0)
+            out.append((box, text, conf, _touches_seam(box_bounds(box), tile, w, h)))
+        return out
+
+    def reread(bounds):
+        # one line strip (+ a little context), still far below a tile
+        pad = SEAM_MARGIN * 2
+        x0, y0 = max(0, int(bounds[0]) - pad), max(0, int(bounds[1]) - pad)
+        x1, y1 = min(w, int(bounds[2]) + pad), min(h, int(bounds[3]) + pad)
+        results = reader.readtext(image[y0:y1, x0:x1], detail=1, **kwargs)
+        return [(_offset(box, x0, y0), text, conf) for box, text, conf in results]
+
+    # Tiles run one after another by default: each inference already uses
+    # the intra-op threads the scheduler budgeted for this document.
+    if workers > 1:
+        with ThreadPoolExecutor(max_workers=workers) as pool:
+            per_tile = list(pool.map(run, tiles))
+    else:
+        per_tile = [run(tile) for tile in tiles]
+
+    return merge_tile_results([c for cands in per_tile for c in cands], reread)
@@ -0,0 +1,145 @@
+import os
+import time
+
+import numpy as np
+from PIL import Image
+
+
+# ===== PRE-OCR TRIAGE =====
+# Cheap, vectorized quality checks on a downscaled grayscale copy, so
+# blurry / black / tiny / text-less uploads (selfies, photos) are turned
+# away in milliseconds instead of going through every OCR pass.
+#
+# Text detection runs at low resolution first. Small print can vanish
+# there, so a page that looks text-less is detected again at the OCR
+# canvas size before anything is decided: only a page with no text at
+# full resolution is rejected, sparse text is just a warning.
+
+TRIAGE_SIDE = 512          # analysis resolution (max side)
+DETECT_SIDE = 640          # low-res detector pass (max side)
+
+MIN_SIDE = 200             # px, original image
+BLUR_REJECT_VAR = 8.0      # Laplacian variance at TRIAGE_SIDE
+BLUR_WARN_VAR = 40.0
+DARK_MEAN = 35
+BRIGHT_FRACTION = 0.97
+MIN_DYNAMIC_RANGE = 25
+MIN_TEXT_DENSITY = 0.004   # text box area / image area
+
+
+def triage_enabled():
+    return os.environ.get("OCR_TRIAGE", "1") != "0"
+
+
+def _gray(image, side):
+    if isinstance(image, np.ndarray):
+        image = Image.fromarray(image.astype(np.uint8))
+    gray = image.convert("L")
+    gray.thumbnail((side, side))
+    return np.asarray(gray, dtype=np.float32)
+
+
+def laplacian_variance(gray):
+    lap = (
+        gray[1:-1, :-2] + gray[1:-1, 2:] +
+        gray[:-2, 1:-1] + gray[2:, 1:-1] -
+        4.0 * gray[1:-1, 1:-1]
+    )
+    return float(lap.var()) if lap.size else 0.0
+
+
+def exposure_stats(gray):
+    hist = np.bincount(gray.astype(np.uint8).ravel(), minlength=256)
+    cdf = np.cumsum(hist) / max(hist.sum(), 1)
+    p1 = int(np.searchsorted(cdf, 0.01))
+    p99 = int(np.searchsorted(cdf, 0.99))
+    # print on a mostly white page can be well under 1% of the pixels
+    p01 = int(np.searchsorted(cdf, 0.001))
+    return {
+        "mean": round(float(gray.mean()), 1),
+        "bright_fraction": round(float(hist[240:].sum() / max(hist.sum(), 1)), 3),
+        "dynamic_range": p99 - p1,
+        "ink_range": p99 - p01
+    }
+
+
+def text_density(image, reader, side=DETECT_SIDE):
+    """Fraction of the page covered by detected text boxes at `side` px."""
+    small = _gray(image, side)
+    rgb = np.stack([small.astype(np.uint8)] * 3, axis=-1)
+    boxes = reader.detect(rgb, canvas_size=side)
+
+    area = 0.0
+    for box in boxes:
+        xs = [p[0] for p in box]
+        ys = [p[1] for p in box]
+        area += max(0, max(xs) - min(xs)) * max(0, max(ys) - min(ys))
+    return round(area / max(small.size, 1), 4), len(boxes)
+
+
+def triage_image(image, reader=None, canvas_size=2560):
+    """
+    Returns {"ok", "reason", "warnings", "metrics", "elapsed_ms"}.
+    ok=False means OCR should not run; reason says why. canvas_size is
+    the detector size OCR will use (the full-resolution re-check).
+    """
+    start = time.perf_counter()
+    if isinstance(image, np.ndarray):
+        height, width = image.shape[:2]
+    else:
+        width, height = image.size
+
+    metrics = {"width": width, "height": height}
+    warnings = []
+    reason = None
+
+    if min(width, height) < MIN_SIDE:
+        reason = f"Image too small ({width}×{height}px)"
+
+    if reason is None:
+        gray = _gray(image, TRIAGE_SIDE)
+        metrics["blur_var"] = round(laplacian_variance(gray), 1)
+        metrics.update(exposure_stats(gray))
+
+        # a sparse A4 page is mostly white paper too: mostly bright is
+        # only a reject when nothing on it has any contrast
+        bright = metrics["bright_fraction"] > BRIGHT_FRACTION
+        if metrics["mean"] < DARK_MEAN:
+            reason = "Image is too dark"
+        elif bright and metrics["ink_range"] < MIN_DYNAMIC_RANGE:
+            reason = "Image is overexposed / blank"
+        elif not bright and metrics["dynamic_range"] < MIN_DYNAMIC_RANGE:
+            reason = "Image has almost no contrast"
+        elif metrics["blur_var"] < BLUR_REJECT_VAR:
+            reason = "Image is too blurry to read"
+        elif metrics["blur_var"] < BLUR_WARN_VAR:
+            warnings.append("Image looks slightly blurry")
+
+        if reason is None and bright:
+            warnings.append("Image is mostly blank / bright")
+
+    if reason is None and reader is not None:
+        try:
+            metrics["text_density"], metrics["text_boxes"] = text_density(image, reader)
+            if metrics["text_boxes"] == 0 or metrics["text_density"] < MIN_TEXT_DENSITY:
+                full_side = min(max(width, height), canvas_size)
+                if full_side > DETECT_SIDE:
+                    metrics["text_density"], metrics["text_boxes"] = text_density(
+                        image, reader, full_side
+                    )
+                    metrics["full_res_check"] = True
+            if metrics["text_boxes"] == 0:
+                reason = "No document text detected (not an ID document?)"
+            elif metrics["text_density"] < MIN_TEXT_DENSITY:
+                warnings.append("Very little text detected (not an ID document?)")
+        except Exception:
+            # Density is advisory; never block OCR on a failed detector pass
+            pass
+
+    return {
+        "ok": reason is None,
+        "reason": reason,
+        "warnings": warnings,
+        "metrics": metrics,
+        "elapsed_ms": round(1000 * (time.perf_counter() - start), 2)
+    }
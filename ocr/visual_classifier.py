@@ -0,0 +1,191 @@
+import time
+
+import numpy as np
+from PIL import Image
+
+
+# ===== PRE-OCR VISUAL CLASSIFIER =====
+# Guesses document type + orientation from a small thumbnail in a few
+# milliseconds, before any OCR runs:
+#   * Aadhaar: saffron / green tricolor bands along the header edge
+#   * PAN:     light-blue tinted card background / blue header band
+#   * layout:  ID cards are landscape ~1.59:1
+# The guess only picks an OCR route; ocr_on_image falls back to the full
+# three-pass OCR whenever the routed result misses what it expected.
+#
+# Colour alone is not enough (an A4 resume with a navy sidebar scores
+# PAN 1.0), so the route and orientation are only "trusted" when the
+# image has an ID-card aspect ratio AND a real header band: a colour
+# stripe running along one long edge, thinner than the edge band, with
+# no matching stripe on the other edges. Anything else takes the
+# unrouted path.
+
+THUMB_SIZE = 128
+MIN_ROUTE_CONFIDENCE = 0.6
+
+# hue ranges in degrees
+SAFFRON = (15, 45)
+GREEN = (80, 160)
+BLUE = (190, 250)
+
+EDGE_BAND = 0.2
+# ID-1 cards are 1.586:1; A4 / Letter pages (1.41, 1.29) stay outside
+CARD_ASPECT = (1.45, 1.85)
+# a header stripe covers most of its edge ...
+MIN_BAND_SPAN = 0.6
+# ... and stops inside the edge band (the slice next to it is mostly clear)
+MAX_INNER_RATIO = 0.5
+
+
+# ================= OCR ROUTES =================
+# roi:      which crop the paragraph pass reads (see ocr_engine.ROI_CROPS)
+# passes:   which OCR passes to run, in order
+# expect:   regex the routed text must contain, otherwise full OCR runs
+DEFAULT_ROUTE = {
+    "name": "default",
+    "roi": "aadhaar",
+    "passes": ("roi", "full", "enhanced"),
+    "expect": None
+}
+
+ROUTES = {
+    "Aadhaar Card": {
+        "name": "aadhaar",
+        "roi": "aadhaar",
+        "passes": ("roi", "full"),
+        "expect": r"\b\d{4}\s?\d{4}\s?\d{4}\b"
+    },
+    "PAN Card": {
+        "name": "pan",
+        "roi": "pan",
+        "passes": ("roi", "full"),
+        "expect": r"\b[A-Z]{5}\d{4}[A-Z]\b"
+    }
+}
+
+
+def thumbnail_hsv(image):
+    if isinstance(image, np.ndarray):
+        image = Image.fromarray(image.astype(np.uint8))
+    thumb = image.convert("RGB")
+    thumb.thumbnail((THUMB_SIZE, THUMB_SIZE))
+    hsv = np.asarray(thumb.convert("HSV"), dtype=np.float32)
+    hue = hsv[..., 0] * (360.0 / 255.0)
+    return hue, hsv[..., 1], hsv[..., 2]
+
+
+def _hue_mask(hue, sat, val, hue_range, min_sat=80):
+    return (hue >= hue_range[0]) & (hue <= hue_range[1]) & (sat >= min_sat) & (val >= 60)
+
+
+def _edge_fractions(mask):
+    h, w = mask.shape
+    bh, bw = max(1, int(h * EDGE_BAND)), max(1, int(w * EDGE_BAND))
+    return {
+        0: mask[:bh].mean(),         # header on top → upright
+        90: mask[:, :bw].mean(),     # header on the left → rotated 90° CCW
+        180: mask[-bh:].mean(),
+        270: mask[:, -bw:].mean()
+    }
+
+
+def _orientation(edges):
+    ranked = sorted(edges.items(), key=lambda e: -e[1])
+    best, runner_up = ranked[0], ranked[1]
+    # only trust a clearly dominant header band
+    if best[1] > 0.05 and best[1] >= 2 * runner_up[1]:
+        return best[0]
+    return 0
+
+
+def _edge_slices(mask, edge):
+    """(band along `edge`, the equally thick slice just inside it)."""
+    h, w = mask.shape
+    bh, bw = max(1, int(h * EDGE_BAND)), max(1, int(w * EDGE_BAND))
+    if edge == 0:
+        return mask[:bh], mask[bh:2 * bh]
+    if edge == 180:
+        return mask[-bh:], mask[-2 * bh:-bh]
+    if edge == 90:
+        return mask[:, :bw].T, mask[:, bw:2 * bw].T
+    return mask[:, -bw:].T, mask[:, -2 * bw:-bw].T
+
+
+def _header_band(mask, edges):
+    """True when the dominant edge of `mask` holds a real header stripe."""
+    edge = _orientation(edges)
+    if edges[edge] <= 0.05:
+        return False
+    h, w = mask.shape
+    # the header runs along a long side (top of an upright landscape card)
+    if (edge in (0, 180)) != (w >= h):
+        return False
+    band, inner = _edge_slices(mask, edge)
+    return (
+        band.any(axis=0).mean() >= MIN_BAND_SPAN and
+        inner.mean() <= MAX_INNER_RATIO * band.mean()
+    )
+
+
+def classify_visual(image):
+    """
+    Returns {"document", "confidence", "orientation", "trusted",
+    "elapsed_ms"}. orientation = degrees the content is rotated
+    counter-clockwise; trusted = confident, card-shaped and with a header
+    band (route_for and the orientation step ignore anything else).
+    """
+    start = time.perf_counter()
+    hue, sat, val = thumbnail_hsv(image)
+    h, w = hue.shape
+
+    saffron = _hue_mask(hue, sat, val, SAFFRON)
+    green = _hue_mask(hue, sat, val, GREEN)
+    # PAN blue is a pale tint, so a much lower saturation floor
+    blue = _hue_mask(hue, sat, val, BLUE, min_sat=35)
+
+    tricolor_edges = _edge_fractions(saffron | green)
+    blue_edges = _edge_fractions(blue)
+    aspect = max(w, h) / max(min(w, h), 1)
+    card_like = CARD_ASPECT[0] <= aspect <= CARD_ASPECT[1]
+
+    aadhaar_score = min(1.0, 4 * max(tricolor_edges.values()) + 2 * saffron.mean())
+    pan_score = min(1.0, 1.6 * blue.mean() + 2 * max(blue_edges.values()))
+    if card_like:
+        aadhaar_score = min(1.0, aadhaar_score + 0.1)
+        pan_score = min(1.0, pan_score + 0.1)
+
+    if aadhaar_score >= pan_score:
+        document, confidence = "Aadhaar Card", aadhaar_score
+        mask, edges = saffron | green, tricolor_edges
+    else:
+        document, confidence = "PAN Card", pan_score
+        mask, edges = blue, blue_edges
+
+    trusted = bool(
+        confidence >= MIN_ROUTE_CONFIDENCE and
+        card_like and
+        _header_band(mask, edges)
+    )
+    if not trusted:
+        document = "Unknown"
+
+    return {
+        "document": document,
+        "confidence": round(float(confidence), 3),
+        "orientation": _orientation(edges) if trusted else 0,
+        "trusted": trusted,
+        "elapsed_ms": round(1000 * (time.perf_counter() - start), 2)
+    }
+
+
+def route_for(visual):
+    if not visual.get("trusted"):
+        return DEFAULT_ROUTE
+    return ROUTES.get(visual["document"], DEFAULT_ROUTE)
+
+
+def correct_orientation(image, orientation):
+    """Rotate a PIL image back to upright."""
+    if not orientation:
+        return image
+    return image.rotate(-orientation, expand=True)
@@ -0,0 +1,554 @@
+import hashlib
+import multiprocessing
+import os
+import threading
+import time
+from collections import OrderedDict
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+from concurrent.futures import TimeoutError as FuturesTimeout
+
+import numpy as np
+import pypdfium2 as pdfium
+
+from ocr.card_segmentation import segment_cards, segmentation_enabled
+from ocr.deadline import Deadline, JobCancelled
+from ocr.image_io import (
+    LazyPages, decode_image, draft_side, is_tiff, tiff_pages, MAX_IMAGE_SIDE
+)
+from ocr.ocr_engine import ocr_on_image, ocr_settings, OCR_VERSION
+from ocr.profiles import get_profile
+from ocr.scheduler import get_scheduler
+from ocr.shm_transport import SharedPages, attached
+from utils.stage_cache import (
+    StageChain,
+    document_key,
+    get_stage_cache,
+    raster_cache_enabled,
+    stage_key
+)
+from verification.duplicate_index import image_hash
+from verification.final_verification import verify_document
+from verification.result_store import get_result_store
+
+
+# ---------------- PDF → IMAGE ----------------
+# pdfium is not thread-safe, and documents render on job threads and
+# their read-ahead threads at once: every call into it (open, render,
+# close) holds this lock.
+_PDFIUM_LOCK = threading.Lock()
+
+
+def pdf_pages(pdf_bytes, scale=3):
+    """Pages rendered lazily, as the pipeline reaches them."""
+    with _PDFIUM_LOCK:
+        pdf = pdfium.PdfDocument(pdf_bytes)
+        count = len(pdf)
+
+    def render(i):
+        with _PDFIUM_LOCK:
+            if pdf is None:
+                raise JobCancelled()    # read-ahead past the end of the job
+            page = pdf[i]
+            bitmap = page.render(scale=scale)
+            try:
+                # PIL → NumPy (NO cv2); the copy outlives the bitmap
+                return np.array(bitmap.to_pil().convert("RGB"))
+            finally:
+                bitmap.close()
+                page.close()
+
+    def close():
+        nonlocal pdf
+        with _PDFIUM_LOCK:
+            pdf.close()
+            pdf = None
+
+    return LazyPages(count, render, close=close)
+
+
+def load_pages(file_bytes, is_pdf, profile=None):
+    """Sized, iterable pages: PDF pages and TIFF frames are decoded lazily."""
+    profile = get_profile(profile)
+    if is_pdf:
+        return pdf_pages(file_bytes, scale=profile["pdf_scale"])
+    if is_tiff(file_bytes):
+        # scanner output: multi-page TIFF, no PDF round trip
+        return tiff_pages(file_bytes)
+    # one reduced, EXIF-upright decode straight into the OCR layout
+    return [decode_image(file_bytes, canvas_size=profile["canvas_size"])[0]]
+
+
+# ---------------- DOCUMENT JOB ----------------
+# A job nobody has looked at for this long belongs to a closed session
+ABANDON_AFTER = float(os.environ.get("JOB_ABANDON_AFTER", "30"))
+
+
+class DocumentJob:
+    """
+    Progress + results of one uploaded file.
+    Written by a worker thread, read by Streamlit reruns via snapshot().
+    """
+
+    def __init__(self, key, file_name, profile=None):
+        self.key = key
+        self.file_name = file_name
+        self.profile = get_profile(profile)
+        self.future = None
+        self.ticket = None
+        self.last_seen = time.monotonic()
+        self.viewers = set()
+        self._cancelled = False
+        self._lock = threading.Lock()
+        self._state = {
+            "stage": "queued",
+            "page": 0,
+            "page_count": 0,
+            "pages_done": 0,
+            "ocr_pass": 0,
+            "ocr_passes": 0,
+            "pages": [],
+            "error": None,
+            "done": False
+        }
+
+    def update(self, **changes):
+        with self._lock:
+            self._state.update(changes)
+
+    def add_page(self, page_result):
+        with self._lock:
+            self._state["pages"] = self._state["pages"] + [page_result]
+
+    def touch(self, session_id=None):
+        """Called on every rerun that displays this job."""
+        self.last_seen = time.monotonic()
+        if session_id is not None:
+            self.viewers.add(session_id)
+
+    def cancel(self):
+        self._cancelled = True
+
+    def should_cancel(self):
+        return (
+            self._cancelled or
+            time.monotonic() - self.last_seen > ABANDON_AFTER
+        )
+
+    def reusable(self):
+        state = self.snapshot()
+        return not state["error"] and state["stage"] != "cancelled"
+
+    def snapshot(self):
+        with self._lock:
+            state = dict(self._state)
+        state["queue_position"] = (
+            self.ticket.position()
+            if self.ticket is not None and state["stage"] == "queued" else 0
+        )
+        state["fraction"] = _progress_fraction(state)
+        return state
+
+
+def _progress_fraction(state):
+    if state["done"]:
+        return 1.0
+    if not state["page_count"]:
+        return 0.0
+
+    # Each page: OCR passes fill 90%, verification the last 10%.
+    # ocr_pass is the pass currently running (1-based).
+    within_page = 0.0
+    if state["ocr_passes"]:
+        within_page = 0.9 * (state["ocr_pass"] - 1) / state["ocr_passes"]
+    if state["stage"] == "verification":
+        within_page = 0.9
+
+    return min((state["pages_done"] + within_page) / state["page_count"], 1.0)
+
+
+def describe_progress(state):
+    stage = state["stage"]
+    if stage == "queued":
+        if state["queue_position"]:
+            return f"⏳ Queued for OCR · position {state['queue_position']}"
+        return "⏳ Waiting for a free worker..."
+    if stage == "rendering":
+        return "🔍 Rendering document pages..."
+
+    page_info = f"Page {state['page'] + 1}/{max(state['page_count'], 1)}"
+    if stage == "ocr" and not state["ocr_passes"]:
+        return f"🧠 {page_info} · Running OCR..."
+    if stage == "ocr":
+        return (
+            f"🧠 {page_info} · OCR pass "
+            f"{state['ocr_pass']} of {state['ocr_passes']}"
+        )
+    if stage == "verification":
+        return f"🛡️ {page_info} · Verifying document..."
+    return "✅ Done"
+
+
+def process_document(job, file_bytes, is_pdf):
+    try:
+        # Holds one of the scheduler's OCR slots for the whole document.
+        # The time budget starts once the slot is granted.
+        with job.ticket:
+            deadline = Deadline(cancel_check=job.should_cancel)
+            _run_document(job, file_bytes, is_pdf, deadline)
+
+    except JobCancelled:
+        job.update(stage="cancelled", done=True)
+
+    except Exception as e:
+        job.update(stage="failed", error=str(e), done=True)
+
+    return job
+
+
+def _run_document(job, file_bytes, is_pdf, deadline):
+    deadline.check()
+    job.update(stage="rendering")
+    pages = load_pages(file_bytes, is_pdf, job.profile)
+    try:
+        _run_pages(job, pages, file_bytes, is_pdf, deadline)
+    finally:
+        if isinstance(pages, LazyPages):
+            pages.close()
+
+
+def _run_pages(job, pages, file_bytes, is_pdf, deadline):
+    job.update(page_count=len(pages))
+
+    digest = hashlib.sha256(file_bytes).hexdigest()
+    cache = get_stage_cache()
+    keys = _page_keys(document_key(digest), is_pdf, job.profile, len(pages))
+    store = get_result_store()
+
+    with SharedPages() as shared:
+        for i, page in enumerate(_cached_pages(pages, keys, cache)):
+            job.update(stage="ocr", page=i, ocr_pass=0, ocr_passes=0)
+            page_deadline = deadline.split(len(pages) - i)
+
+            if isinstance(page, dict):
+                # OCR stage hit: only verification runs (and may hit too)
+                results = page["results"]
+                stored = True
+            else:
+                results = _ocr_results(job, page, page_deadline, shared)
+                stored = _store_ocr(cache, keys[i][1], job, i, results)
+
+            # the stages below are keyed on the OCR key alone: results that
+            # weren't stored under it must not fill (or read) them either
+            stage_cache = cache if stored else None
+
+            job.update(stage="verification")
+            entries = []
+            for k, (card_box, result) in enumerate(results):
+                stages = StageChain(stage_cache, stage_key(keys[i][1], "result", k))
+                # the upload's digest: its own pages / cards, and re-runs of
+                # it (Retry, another profile, an evicted job) never count
+                # as "seen before"
+                submission = {
+                    "id": digest,
+                    "image_hash": result["final"].get("image_hash")
+                }
+                entries.append(_page_entry(
+                    job, i, result, card_box, k, len(results), stages, submission
+                ))
+                job.add_page(entries[-1])
+            if store is not None:
+                # audit trail (see verification/result_store.py)
+                store.record(digest, entries, job.profile["name"])
+
+            job.update(pages_done=i + 1)
+
+    job.update(stage="done", done=True)
+
+
+def _ocr_results(job, img, deadline, shared):
+    """[(card box or None, OCR result), ...] for one page."""
+    cards = segment_cards(img)["cards"] if segmentation_enabled() else []
+    if cards:
+        return _run_cards(job, img, cards, deadline, shared)
+
+    progress = lambda k, n: job.update(ocr_pass=k, ocr_passes=n)
+    result = _ocr_page(img, deadline, shared, job.profile, progress)
+    result["final"]["image_hash"] = image_hash(img)
+    return [(None, result)]
+
+
+# ---------------- MULTI-CARD PAGES ----------------
+# A sheet holding several cards (Aadhaar front + back, Aadhaar + PAN) is
+# split by ocr.card_segmentation; every card gets its own OCR, verification
+# and report, OCR_CARD_WORKERS of them at a time. The document holds a
+# single scheduler slot, and the torch threads are sized for one OCR per
+# slot, so cards run one after another by default; raise it only when
+# OCR_MAX_CONCURRENT leaves idle cores.
+CARD_WORKERS = int(os.environ.get("OCR_CARD_WORKERS", "1"))
+
+
+def _run_cards(job, img, cards, deadline, shared):
+    def run(box):
+        x0, y0, x1, y1 = box
+        crop = np.ascontiguousarray(img[y0:y1, x0:x1])
+        result = _ocr_page(crop, deadline, shared, job.profile)
+        result["final"]["image_hash"] = image_hash(crop)
+        return box, result
+
+    workers = max(1, min(CARD_WORKERS, len(cards)))
+    with ThreadPoolExecutor(max_workers=workers, thread_name_prefix="card-ocr") as pool:
+        # results come back in reading order; an error / JobCancelled in
+        # any card propagates to the document
+        return list(pool.map(run, cards))
+
+
+def _page_entry(job, page, result, card_box=None, card=0, card_count=1,
+                stages=None, submission=None):
+    text = result["final"]["text"]
+    confidence = result["final"]["confidence"]
+
+    report = verify_document(
+        text, confidence, job.file_name, job.profile, stages, submission
+    )
+
+    triage = result["final"].get("triage")
+    if triage and not triage["ok"]:
+        report["Triage"] = f"Rejected before OCR – {triage['reason']}"
+        report["Overall Integrity"] = "REJECTED – UNUSABLE INPUT"
+    elif triage and triage["warnings"]:
+        report["Image Quality Warning"] = "; ".join(triage["warnings"])
+
+    route = result["final"].get("route")
+    if route:
+        report["OCR Route"] = route + (
+            " → full OCR fallback" if result["final"].get("fallback") else ""
+        )
+
+    fast = result["final"].get("fast_path")
+    if fast:
+        report["OCR Mode"] = "ID fast path (full-page OCR skipped)"
+        if not fast.get("name"):
+            report["Name Warning"] = (
+                "Name line not read on the ID fast path – check the name "
+                "manually or re-run with the balanced profile"
+            )
+
+    skipped = result["final"].get("skipped_passes", [])
+    if skipped:
+        report["OCR Truncated"] = True
+        report["OCR Deadline Warning"] = (
+            f"Time budget exhausted – {len(skipped)} OCR pass(es) "
+            "skipped, result is partial"
+        )
+
+    entry = {
+        "raw": result,
+        "page": page,
+        "text": text,
+        "confidence": confidence,
+        "report": report
+    }
+    if card_box is not None:
+        entry.update(card=card + 1, card_count=card_count, card_box=card_box)
+        report["Card"] = f"{card + 1} of {card_count} on page {page + 1}"
+    return entry
+
+
+# ---------------- STAGE CACHE ----------------
+# With OCR_STAGE_CACHE set, every page's OCR output (and optionally its
+# raster) is stored under version-chained keys (see utils/stage_cache.py):
+# re-uploads skip OCR, and a rule version bump re-runs only verification.
+RASTER_VERSION = 2      # bump when page rendering / decoding changes
+
+
+def _page_keys(doc_key, is_pdf, profile, count):
+    """
+    (raster key, OCR key) per page. The raster key covers the PDF scale
+    and the image decode sizes (OCR_MAX_IMAGE_SIDE, the JPEG draft target
+    from the detector canvas); the OCR key covers the backend and every
+    toggle that changes OCR output (ocr_settings), plus card segmentation,
+    which decides what gets OCR'd.
+    """
+    scale = profile["pdf_scale"] if is_pdf else None
+    decode = (MAX_IMAGE_SIDE, draft_side(canvas_size=profile["canvas_size"]))
+    settings = (ocr_settings(profile), segmentation_enabled())
+    keys = []
+    for i in range(count):
+        raster = stage_key(doc_key, "raster", RASTER_VERSION, scale, decode, i)
+        keys.append((raster, stage_key(raster, "ocr", OCR_VERSION, *settings)))
+    return keys
+
+
+def _cached_pages(pages, keys, cache):
+    """
+    `pages` with the stage cache in front: a page whose OCR is stored
+    comes back as that stored entry and is never rendered.
+    """
+    if cache is None:
+        return pages
+    load = pages.load if isinstance(pages, LazyPages) else pages.__getitem__
+
+    def cached_load(i):
+        raster_key, ocr_key = keys[i]
+        stored = cache.get("ocr", ocr_key)
+        if stored is not None:
+            return stored
+        if not raster_cache_enabled():
+            return load(i)
+        img = cache.get("raster", raster_key)
+        if img is None:
+            img = load(i)
+            cache.put("raster", raster_key, img)
+        return img
+
+    return LazyPages(len(pages), cached_load, getattr(pages, "window", 1))
+
+
+def _store_ocr(cache, key, job, page, results):
+    """Stores the page's OCR results; False when they were not stored."""
+    # deadline-truncated or errored OCR is partial: never serve it again
+    if cache is None or any(
+        r["final"].get("truncated") or r["final"].get("error") for _, r in results
+    ):
+        return False
+    cache.put("ocr", key, {
+        "file_name": job.file_name,
+        "page": page,
+        "profile": job.profile["name"],
+        "results": results
+    })
+    return True
+
+
+def reverify_cached(cache, profile=None):
+    """
+    Re-runs verification over every stored OCR result, e.g. after a rule
+    version bump; OCR itself never runs and nothing is added to the
+    duplicate index. Yields the page entries.
+    profile: override the profile each result was read with.
+    """
+    for key, stored in cache.entries("ocr"):
+        job = DocumentJob(key, stored["file_name"], profile or stored["profile"])
+        results = stored["results"]
+        for k, (card_box, result) in enumerate(results):
+            stages = StageChain(cache, stage_key(key, "result", k))
+            yield _page_entry(job, stored["page"], result, card_box, k, len(results), stages)
+
+
+# ---------------- OCR WORKER PROCESSES ----------------
+# OCR_PROCESS_WORKERS=N runs page OCR in N spawned processes (each loads
+# its own model) instead of the document thread. Pages travel as
+# shared-memory handles, not pickled arrays; per-pass progress and
+# mid-page cancellation stay in-process only.
+PROCESS_WORKERS = int(os.environ.get("OCR_PROCESS_WORKERS", "0"))
+
+_process_pool = None
+_process_pool_lock = threading.Lock()
+
+
+def get_process_pool():
+    global _process_pool
+    with _process_pool_lock:
+        if _process_pool is None:
+            _process_pool = ProcessPoolExecutor(
+                max_workers=PROCESS_WORKERS,
+                mp_context=multiprocessing.get_context("spawn")
+            )
+        return _process_pool
+
+
+def ocr_shared_page(handle, budget, profile=None):
+    """Worker-process entry point: OCR a page shared via SharedPages."""
+    with attached(handle) as image:
+        return ocr_on_image(image, deadline=Deadline(budget=budget), profile=profile)
+
+
+def _ocr_page(img, deadline, shared, profile, progress=None):
+    if PROCESS_WORKERS <= 0:
+        return ocr_on_image(img, progress=progress, deadline=deadline, profile=profile)
+
+    handle = shared.share(img)
+    try:
+        future = get_process_pool().submit(
+            ocr_shared_page, handle, deadline.remaining(), profile
+        )
+        while True:
+            try:
+                return future.result(timeout=0.5)
+            except FuturesTimeout:
+                # the worker runs to its own deadline; we just stop waiting
+                deadline.check()
+    finally:
+        # unlinking while a worker still maps it is safe: the mapping
+        # stays valid until the worker closes it
+        shared.release(handle)
+
+
+# ---------------- BACKGROUND EXECUTOR ----------------
+class JobManager:
+    """
+    Process-wide executor + job registry.
+    Jobs are keyed by (content hash, file name, profile), so reruns and
+    other sessions uploading the same file reuse the finished result.
+    """
+
+    def __init__(self, max_workers=None, max_jobs=64, scheduler=None):
+        self.scheduler = scheduler or get_scheduler()
+        if max_workers is None:
+            # Queued jobs park a thread on their ticket, so the pool must
+            # cover running + waiting jobs for the scheduler to see them all
+            max_workers = int(os.environ.get(
+                "DOC_WORKERS",
+                self.scheduler.max_concurrent + self.scheduler.max_queue
+            ))
+        self.executor = ThreadPoolExecutor(
+            max_workers=max_workers,
+            thread_name_prefix="doc-worker"
+        )
+        self.max_jobs = max_jobs
+        self._jobs = OrderedDict()
+        self._lock = threading.Lock()
+
+    def submit(self, key, file_name, file_bytes, is_pdf, session_id=None,
+               profile=None):
+        """
+        profile: ocr.profiles name (default OCR_PROFILE); part of `key`
+        for callers that offer more than one.
+        Raises SchedulerBusy when the OCR queue is full.
+        """
+        with self._lock:
+            job = self._jobs.get(key)
+            if job is not None and job.reusable():
+                self._jobs.move_to_end(key)
+                return job
+
+            job = DocumentJob(key, file_name, profile)
+            job.ticket = self.scheduler.enqueue(session_id)
+            job.future = self.executor.submit(
+                process_document, job, file_bytes, is_pdf
+            )
+            self._jobs[key] = job
+            self._evict()
+            return job
+
+    def cancel(self, key, session_id=None):
+        """
+        Stops a running job (e.g. its file was removed from the page).
+        With session_id, only that session stops watching it; the job is
+        cancelled once no session that displayed it is left.
+        """
+        with self._lock:
+            job = self._jobs.get(key)
+        if job is None or job.future.done():
+            return
+        job.viewers.discard(session_id)
+        if session_id is None or not job.viewers:
+            job.cancel()
+
+    def _evict(self):
+        # Drop least-recently used *finished* jobs once over budget
+        for key in list(self._jobs):
+            if len(self._jobs) <= self.max_jobs:
+                break
+            if self._jobs[key].future.done():
+                del self._jobs[key]
@@ -1,2 +1,9 @@
 #!/usr/bin/env bash
+set -e
+
+# Load the OCR reader once (writes the snapshot on first boot) and run a
+# dummy inference, so a broken/missing model bundle fails here instead of
+# on the first user request. Set OCR_OFFLINE=1 in images with baked models.
+python -m ocr.model_bundle warmup
+
 streamlit run app.py --server.port=$PORT --server.address=0.0.0.0
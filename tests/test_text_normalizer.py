@@ -0,0 +1,44 @@
+import pytest
+
+from ocr.text_normalizer import (
+    Normalizer, normalize_for_matching, normalize_ocr_line
+)
+
+
+# letters read for digits inside a numeric field become digits
+@pytest.mark.parametrize("text, expected", [
+    ("PIN 56OO01", "PIN 560001"),
+    ("PIN: 560 OO1", "PIN: 560 001"),
+    ("PIN CODE 56OO01", "PIN CODE 560001"),
+    ("1234 56I8 9O12", "1234 5618 9012"),
+    ("DOB: O1/O2/199O", "DOB: 01/02/1990"),
+    ("Year of Birth 2O19", "Year of Birth 2019"),
+])
+def test_numeric_fields_become_digits(text, expected):
+    assert normalize_ocr_line(text) == expected
+
+
+# ... and are left alone everywhere else
+@pytest.mark.parametrize("text", [
+    "Flat 101B",
+    "H.No 208S",
+    "Plot 12A",
+    "Year 2O19",
+    "BOSS SOLD 1234",
+])
+def test_mixed_tokens_are_left_alone(text):
+    assert normalize_ocr_line(text) == text
+
+
+@pytest.mark.parametrize("text, expected", [
+    ("G0VERNMENT of 1ndia", "GOVERNMENT OF INDIA"),
+    ("ABCDE12S4F", "ABCDE1254F"),
+    ("H.No 208S PIN 56OO01", "H NO 208S PIN 560001"),
+])
+def test_matching_text(text, expected):
+    assert normalize_for_matching(text) == expected
+
+
+def test_confusion_fix_off():
+    normalize = Normalizer({}, token=r"[^\W_]+", drop=r"[^\w\s]", confusions=False)
+    assert normalize("PIN 56OO01") == "PIN 56OO01"
@@ -0,0 +1,187 @@
+import hashlib
+import json
+import os
+import pickle
+import sys
+import threading
+import time
+
+
+# ===== PER-STAGE OUTPUT CACHE =====
+# Every pipeline stage (raster → ocr → text → fields → report) stores its
+# output under a key derived from the previous stage's key plus its own
+# version, so the keys form a chain per document:
+#
+#   document hash → raster(v, scale, page) → ocr(v, settings) → text(v)
+#                 → fields(v) → report(v)
+#
+# (OCR settings = profile, backend, quantization and every OCR toggle;
+# see ocr_engine.ocr_settings)
+#
+# Bumping a rule version (field_extractor.RULES_VERSION,
+# final_verification.SCORING_VERSION, ...) changes that stage's key and
+# every key below it; stages above keep hitting. Re-verifying the
+# archive after a rule change therefore re-runs only verification over
+# the stored OCR output:
+#
+#   python -m utils.stage_cache reverify [profile]
+#
+# OCR_STAGE_CACHE is the cache directory (unset = no caching).
+# Rendered pages are large, so the raster stage is only stored with
+# OCR_STAGE_CACHE_RASTER=1.
+
+STAGES = ("raster", "ocr", "text", "fields", "report")
+
+
+def stage_cache_dir():
+    return os.environ.get("OCR_STAGE_CACHE", "")
+
+
+def raster_cache_enabled():
+    return os.environ.get("OCR_STAGE_CACHE_RASTER", "0") == "1"
+
+
+def stage_key(parent, stage, version, *extra):
+    """Key of `stage` below `parent` (None for the document itself)."""
+    payload = repr((parent, stage, version) + extra).encode("utf-8")
+    return hashlib.sha256(payload).hexdigest()
+
+
+def document_key(digest):
+    """Root key of a document from the sha256 hex digest of its bytes."""
+    return stage_key(None, "document", digest)
+
+
+class StageCache:
+    """
+    One pickle per (stage, key) under root/stage/key[:2]/. Writes go
+    through a temp file + os.replace, so concurrent workers never see a
+    half-written entry.
+    """
+
+    def __init__(self, root):
+        self.root = root
+        self.hits = {}
+        self.misses = {}
+        self._lock = threading.Lock()
+
+    def _path(self, stage, key):
+        return os.path.join(self.root, stage, key[:2], key + ".pkl")
+
+    def _count(self, counter, stage):
+        with self._lock:
+            counter[stage] = counter.get(stage, 0) + 1
+
+    def has(self, stage, key):
+        return os.path.exists(self._path(stage, key))
+
+    def get(self, stage, key, default=None):
+        try:
+            with open(self._path(stage, key), "rb") as f:
+                value = pickle.load(f)
+        except FileNotFoundError:
+            self._count(self.misses, stage)
+            return default
+        except (EOFError, pickle.UnpicklingError, AttributeError, ImportError):
+            # written by an incompatible build: treat as a miss
+            self._count(self.misses, stage)
+            return default
+        self._count(self.hits, stage)
+        return value
+
+    def put(self, stage, key, value):
+        path = self._path(stage, key)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        tmp = f"{path}.{os.getpid()}.{threading.get_ident()}.tmp"
+        with open(tmp, "wb") as f:
+            pickle.dump(value, f, protocol=pickle.HIGHEST_PROTOCOL)
+        os.replace(tmp, path)
+
+    def entries(self, stage):
+        """(key, value) of every stored entry of `stage`."""
+        base = os.path.join(self.root, stage)
+        if not os.path.isdir(base):
+            return
+        for shard in sorted(os.listdir(base)):
+            for name in sorted(os.listdir(os.path.join(base, shard))):
+                if name.endswith(".pkl"):
+                    key = name[:-4]
+                    value = self.get(stage, key)
+                    if value is not None:
+                        yield key, value
+
+    def chain(self, key):
+        return StageChain(self, key)
+
+    def stats(self):
+        with self._lock:
+            return {"hits": dict(self.hits), "misses": dict(self.misses)}
+
+
+class StageChain:
+    """
+    run(stage, version, compute) for consecutive stages of one document:
+    each stage is keyed below the previous one and only computed on a
+    miss. cache=None computes everything (no caching configured).
+    """
+
+    def __init__(self, cache, key):
+        self.cache = cache
+        self.key = key
+
+    def __call__(self, stage, version, compute, *extra):
+        self.key = stage_key(self.key, stage, version, *extra)
+        if self.cache is None:
+            return compute()
+        value = self.cache.get(stage, self.key)
+        if value is None:
+            value = compute()
+            self.cache.put(stage, self.key, value)
+        return value
+
+
+_cache = None
+_cache_lock = threading.Lock()
+
+
+def get_stage_cache():
+    """Process-wide StageCache, or None when OCR_STAGE_CACHE is unset."""
+    global _cache
+    root = stage_cache_dir()
+    if not root:
+        return None
+    with _cache_lock:
+        if _cache is None or _cache.root != root:
+            _cache = StageCache(root)
+        return _cache
+
+
+# ===== CLI =====
+def main(argv):
+    command = argv[1] if len(argv) > 1 else "stats"
+    cache = get_stage_cache()
+    if cache is None:
+        sys.exit("OCR_STAGE_CACHE is not set")
+
+    if command == "reverify":
+        from pipeline import reverify_cached
+
+        start = time.perf_counter()
+        profile = argv[2] if len(argv) > 2 else None
+        documents = sum(1 for _ in reverify_cached(cache, profile))
+        print(json.dumps({
+            "documents": documents,
+            "seconds": round(time.perf_counter() - start, 2),
+            **cache.stats()
+        }))
+        return
+
+    counts = {
+        stage: sum(len(files) for _, _, files in os.walk(os.path.join(cache.root, stage)))
+        for stage in STAGES
+    }
+    print(json.dumps(counts))
+
+
+if __name__ == "__main__":
+    main(sys.argv)
@@ -0,0 +1,300 @@
+import math
+import os
+import secrets
+import sqlite3
+import threading
+import time
+
+import numpy as np
+from PIL import Image
+
+from verification.result_store import salted_hash
+
+
+# -------------------------------
+# DUPLICATE / REUSED-ID INDEX
+# -------------------------------
+# Flags an Aadhaar / PAN number that was submitted before (possibly under
+# another name) and a page image that is a near-duplicate of an earlier
+# upload, without rescanning past results:
+#   * IDs and names are stored as salted HMACs only
+#   * ID lookups go through a Bloom filter first (a memory-mapped bit
+#     array next to the database): a number never seen before, the common
+#     case, costs a few bit tests and no disk read; hits are confirmed in
+#     the exact index (SQLite, indexed on the hash)
+#   * page images get a 64-bit difference hash, stored split into four
+#     16-bit bands with an index on each; any image within 3 bits shares
+#     a band exactly, so near-duplicates are found by index lookups and a
+#     Hamming check on the few candidates
+#
+# Cards printed from one template differ only in photo, name and numbers,
+# which a 9×8 thumbnail barely sees (same-template cards land 0-5 bits
+# apart). A candidate therefore has to be within NEAR_DUPLICATE_BITS on
+# the coarse hash AND within FINE_BITS on a 256-bit hash of the same
+# image, and two pages that carry different ID numbers are never near
+# duplicates of each other (same template, different holder).
+#
+# Names are compared per token (upper-cased, OCR digit/letter confusions
+# folded): an ID seen before counts as "under another name" only when
+# the two names share no token, so a one-character misread of one name
+# part doesn't trigger it. It is a warning for review, not an integrity
+# downgrade.
+#
+# Off by default (it writes a database and a Bloom filter file that grow
+# with every upload): OCR_DUPLICATE_INDEX is the database path, e.g.
+# duplicate_index.db; the Bloom filter is sized for OCR_DUPLICATE_CAPACITY
+# ids at a 1% false-positive rate.
+
+CAPACITY = int(os.environ.get("OCR_DUPLICATE_CAPACITY", "10000000"))
+BLOOM_ERROR_RATE = 0.01
+NEAR_DUPLICATE_BITS = 2
+FINE_BITS = 12             # of 256
+BANDS = 4
+MAX_CANDIDATES = 200
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS meta (
+    key TEXT PRIMARY KEY,
+    value TEXT NOT NULL
+);
+CREATE TABLE IF NOT EXISTS ids (
+    id_hash TEXT NOT NULL,
+    name_hash TEXT,
+    name_tokens TEXT,
+    submission TEXT NOT NULL,
+    file_name TEXT,
+    created_at REAL NOT NULL
+);
+CREATE INDEX IF NOT EXISTS idx_ids_hash ON ids (id_hash);
+CREATE TABLE IF NOT EXISTS images (
+    phash INTEGER NOT NULL,
+    fine_hash TEXT,
+    id_hashes TEXT,
+    band0 INTEGER NOT NULL,
+    band1 INTEGER NOT NULL,
+    band2 INTEGER NOT NULL,
+    band3 INTEGER NOT NULL,
+    submission TEXT NOT NULL,
+    file_name TEXT,
+    created_at REAL NOT NULL
+);
+CREATE INDEX IF NOT EXISTS idx_images_band0 ON images (band0);
+CREATE INDEX IF NOT EXISTS idx_images_band1 ON images (band1);
+CREATE INDEX IF NOT EXISTS idx_images_band2 ON images (band2);
+CREATE INDEX IF NOT EXISTS idx_images_band3 ON images (band3);
+"""
+
+# columns added after the first release: (table, column, type)
+MIGRATIONS = (
+    ("ids", "name_tokens", "TEXT"),
+    ("images", "fine_hash", "TEXT"),
+    ("images", "id_hashes", "TEXT")
+)
+
+# digit read where a letter belongs in a name
+_NAME_FOLD = str.maketrans("014568", "OIASGB")
+
+
+def duplicate_index_path():
+    return os.environ.get("OCR_DUPLICATE_INDEX", "")
+
+
+def _dhash_bits(gray, w, h):
+    small = np.asarray(gray.resize((w + 1, h), Image.BOX), dtype=np.int16)
+    return (small[:, 1:] > small[:, :-1]).flatten()
+
+
+def image_hash(image):
+    """
+    (64-bit difference hash, signed for SQLite; 256-bit difference hash as
+    hex) of a page / card image.
+    """
+    if isinstance(image, np.ndarray):
+        image = Image.fromarray(image.astype(np.uint8))
+    image.draft("L", (256, 256))
+    gray = image.convert("L")
+    value = int.from_bytes(np.packbits(_dhash_bits(gray, 8, 8)).tobytes(), "big")
+    fine = np.packbits(_dhash_bits(gray, 16, 16)).tobytes().hex()
+    return value - (1 << 64) if value >= 1 << 63 else value, fine
+
+
+def _bands(phash):
+    unsigned = phash & ((1 << 64) - 1)
+    return [(unsigned >> (16 * i)) & 0xFFFF for i in range(BANDS)]
+
+
+def _distance(a, b):
+    return bin((a ^ b) & ((1 << 64) - 1)).count("1")
+
+
+def _fine_distance(a, b):
+    return bin(int(a, 16) ^ int(b, 16)).count("1")
+
+
+def name_tokens(name):
+    """Sorted, de-duplicated name parts with OCR confusions folded."""
+    if not name:
+        return []
+    folded = name.upper().translate(_NAME_FOLD)
+    words = "".join(c if c.isalpha() else " " for c in folded).split()
+    return sorted({w for w in words if len(w) > 1})
+
+
+class BloomFilter:
+    """Memory-mapped Bloom filter over hex digests (already uniform)."""
+
+    def __init__(self, path, capacity=CAPACITY, error_rate=BLOOM_ERROR_RATE):
+        self.m = math.ceil(-capacity * math.log(error_rate) / math.log(2) ** 2)
+        self.k = max(1, round(self.m / capacity * math.log(2)))
+        size = (self.m + 7) // 8
+        self.created = not (os.path.exists(path) and os.path.getsize(path) == size)
+        self.bits = np.memmap(path, np.uint8, "w+" if self.created else "r+", shape=(size,))
+
+    def _positions(self, digest):
+        # double hashing: two 64-bit halves of the digest give all k probes
+        h1 = int(digest[:16], 16)
+        h2 = int(digest[16:32], 16) | 1
+        return [(h1 + i * h2) % self.m for i in range(self.k)]
+
+    def add(self, digest):
+        for p in self._positions(digest):
+            self.bits[p >> 3] |= 1 << (p & 7)
+
+    def __contains__(self, digest):
+        return all(self.bits[p >> 3] & (1 << (p & 7)) for p in self._positions(digest))
+
+    def flush(self):
+        self.bits.flush()
+
+
+class DuplicateIndex:
+
+    def __init__(self, path):
+        self.path = path
+        self._lock = threading.Lock()
+        self._db = sqlite3.connect(path, check_same_thread=False)
+        with self._lock, self._db:
+            self._db.execute("PRAGMA journal_mode=WAL")
+            self._db.executescript(SCHEMA)
+            for table, column, kind in MIGRATIONS:
+                columns = {r[1] for r in self._db.execute(f"PRAGMA table_info({table})")}
+                if column not in columns:
+                    self._db.execute(f"ALTER TABLE {table} ADD COLUMN {column} {kind}")
+            self._db.execute(
+                "INSERT OR IGNORE INTO meta (key, value) VALUES ('id_salt', ?)",
+                (secrets.token_hex(16),)
+            )
+            salt = self._db.execute("SELECT value FROM meta WHERE key = 'id_salt'").fetchone()[0]
+        self.salt = os.environ.get("OCR_ID_SALT", salt).encode("utf-8")
+
+        self.bloom = BloomFilter(path + ".bloom")
+        if self.bloom.created:
+            # new / resized filter: refill from the exact index
+            for (id_hash,) in self._db.execute("SELECT DISTINCT id_hash FROM ids"):
+                self.bloom.add(id_hash)
+            self.bloom.flush()
+
+    def hash(self, value):
+        return salted_hash(self.salt, value)
+
+    def _previous_ids(self, id_hash, submission):
+        if id_hash not in self.bloom:
+            return []
+        return self._db.execute(
+            "SELECT DISTINCT submission, name_tokens FROM ids WHERE id_hash = ? AND submission != ?",
+            (id_hash, submission)
+        ).fetchall()
+
+    def _near_images(self, phash, fine, id_hashes, submission):
+        bands = _bands(phash)
+        rows = self._db.execute(
+            " UNION ".join(
+                f"SELECT phash, fine_hash, id_hashes, file_name FROM images "
+                f"WHERE band{i} = ? AND submission != ?"
+                for i in range(BANDS)
+            ) + f" LIMIT {MAX_CANDIDATES}",
+            [v for band in bands for v in (band, submission)]
+        ).fetchall()
+        matches = []
+        for h, other_fine, other_ids, name in rows:
+            bits = _distance(phash, h)
+            if bits > NEAR_DUPLICATE_BITS or not other_fine:
+                continue
+            if _fine_distance(fine, other_fine) > FINE_BITS:
+                continue
+            # same template, different holder
+            if id_hashes and other_ids and not set(id_hashes) & set(other_ids.split()):
+                continue
+            matches.append((bits, name))
+        return sorted(matches)
+
+    def check_and_add(self, submission, file_name=None, ids=(), name=None, phash=None):
+        """
+        submission: id of this upload, e.g. the digest of its bytes (other
+                    pages / cards and earlier runs of the same upload never
+                    count as duplicates); stored salted-hashed
+        ids:        Aadhaar / PAN numbers found on the page
+        phash:      image_hash() of the page / card
+        Returns {"previous": earlier submissions with one of the ids,
+        "other_names": those under a name sharing no part with this one,
+        "near_images": [(bits, file name), ...]} and records this page.
+        """
+        submission = self.hash(submission)
+        name_hash = self.hash(" ".join(name.split()).upper()) if name else None
+        tokens = " ".join(sorted(self.hash(t) for t in name_tokens(name))) or None
+        id_hashes = [self.hash(n) for n in ids if n]
+        coarse, fine = phash if phash is not None else (None, None)
+        now = time.time()
+
+        with self._lock, self._db:
+            previous = [r for h in id_hashes for r in self._previous_ids(h, submission)]
+            near = (
+                self._near_images(coarse, fine, id_hashes, submission)
+                if coarse is not None else []
+            )
+
+            self._db.executemany(
+                "INSERT INTO ids (id_hash, name_hash, name_tokens, submission, "
+                "file_name, created_at) VALUES (?, ?, ?, ?, ?, ?)",
+                [(h, name_hash, tokens, submission, file_name, now) for h in id_hashes]
+            )
+            for h in id_hashes:
+                self.bloom.add(h)
+            if coarse is not None:
+                self._db.execute(
+                    "INSERT INTO images (phash, fine_hash, id_hashes, band0, band1, "
+                    "band2, band3, submission, file_name, created_at) "
+                    "VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)",
+                    (coarse, fine, " ".join(id_hashes) or None, *_bands(coarse),
+                     submission, file_name, now)
+                )
+
+        return {
+            "previous": len({sub for sub, _ in previous}),
+            "other_names": len({
+                sub for sub, other in previous
+                if other and tokens and not set(other.split()) & set(tokens.split())
+            }),
+            "near_images": near
+        }
+
+    def close(self):
+        with self._lock:
+            self.bloom.flush()
+            self._db.close()
+
+
+_index = None
+_index_lock = threading.Lock()
+
+
+def get_duplicate_index():
+    """Process-wide DuplicateIndex, or None when OCR_DUPLICATE_INDEX is empty."""
+    global _index
+    path = duplicate_index_path()
+    if not path:
+        return None
+    with _index_lock:
+        if _index is None or _index.path != path:
+            _index = DuplicateIndex(path)
+        return _index
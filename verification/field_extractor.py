@@ -1,5 +1,9 @@
 import re
 
+# bump when the extraction rules change (see utils/stage_cache.py)
+RULES_VERSION = 1
+
+
 def extract_fields(text, verified_aadhaar=None):   # ✅ ADDED PARAMETER
     fields = {}
 
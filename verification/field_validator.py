@@ -2,6 +2,9 @@ from verification.utils import verhoeff_check
 import datetime
 import re   # 🔹 ADD: safety cleanup
 
+# bump when the validation rules change (see utils/stage_cache.py)
+RULES_VERSION = 1
+
 
 def validate_fields(fields):
     validation = {}
@@ -1,5 +1,4 @@
 import re
-import unicodedata
 import streamlit as st
 
 from verification.utils import verhoeff_check
@@ -7,43 +6,54 @@ from verification.classifier import classify_document
 from verification.field_extractor import extract_fields
 from verification.field_validator import validate_fields
 from verification.field_confidence import calculate_field_confidence
+from verification.duplicate_index import get_duplicate_index
+from verification.field_extractor import RULES_VERSION as FIELD_RULES_VERSION
+from verification.field_validator import RULES_VERSION as VALIDATION_RULES_VERSION
+from verification.templates import TEMPLATES_VERSION
+from ocr.profiles import get_profile
+from ocr.text_normalizer import (
+    normalize_for_matching, normalizer_settings, NORMALIZER_VERSION
+)
+from utils.stage_cache import StageChain
 
 
 # -------------------------------
 # TEXT NORMALIZATION
 # -------------------------------
 def normalize_text(text):
-    if not text:
-        return ""
-    text = unicodedata.normalize("NFKC", text)
-    text = text.upper()
-    text = re.sub(r"[^A-Z0-9]", " ", text)
-    text = re.sub(r"\s+", " ", text).strip()
-    return text
+    # NFKC + upper-case + A-Z/0-9 filter + whitespace, one compiled pass
+    return normalize_for_matching(text)
+
+
+_LINE_SPLIT = re.compile(r"[.\n]")
+
 
 def clean_ocr_text(text):
     if not text:
         return ""
 
-    lines = re.split(r"[.\n]", text)
     clean_lines = []
 
-    for line in lines:
+    for line in _LINE_SPLIT.split(text):
         line = line.strip()
 
-        # Remove lines with too much noise
-        digit_ratio = sum(c.isdigit() for c in line) / max(len(line), 1)
-        alpha_ratio = sum(c.isalpha() for c in line) / max(len(line), 1)
+        if len(line) < 6:
+            continue
 
-        if digit_ratio > 0.7:
+        # Remove lines with too much noise (one scan for both ratios)
+        digits = alphas = 0
+        for c in line:
+            if c.isdigit():
+                digits += 1
+            elif c.isalpha():
+                alphas += 1
+
+        if digits > len(line) * 0.7:
             continue  # mostly garbage numbers
 
-        if alpha_ratio < 0.25:
+        if alphas < len(line) * 0.25:
             continue  # unreadable text
 
-        if len(line) < 6:
-            continue
-
         clean_lines.append(line)
 
     return " ".join(clean_lines)
@@ -158,20 +168,20 @@ def extract_pan(text):
 
 
 # -------------------------------
-# MAIN VERIFICATION FUNCTION
+# RULE VERSIONS (STAGE CACHE)
 # -------------------------------
-def verify_document(text, confidence, filename):
+# Bump when the matching rules change: cached fields / reports of
+# earlier versions are then recomputed from the stored OCR text.
+ID_RULES_VERSION = 1      # extract_aadhaar_number / extract_pan / keywords
+SCORING_VERSION = 1       # verify_document weights, integrity rules,
+                          # field_confidence
 
-    report = {}
-    report["Uploaded File Name"] = filename
-
-    norm_text = normalize_text(text)
-
-    classification = classify_document(norm_text)
-    report["Document Type"] = classification.get("document", "Unknown")
-    report["Document Category"] = classification.get("category", "Other")
-    report["Template Match Score"] = classification.get("score", 0)
 
+# -------------------------------
+# FIELDS STAGE
+# -------------------------------
+def find_fields(text, norm_text, profile):
+    """ID numbers, extracted fields and their validation."""
     aadhaar_no = extract_aadhaar_number(text)   # 🔴 IMPORTANT: use raw OCR text
     pan_no = extract_pan(norm_text)
 
@@ -185,9 +195,105 @@ def verify_document(text, confidence, filename):
 
     aadhaar_detected = (
         aadhaar_no is not None or
-        fuzzy_contains(norm_text, aadhaar_keywords)
+        fuzzy_contains(norm_text, aadhaar_keywords, profile["fuzzy_errors"])
+    )
+
+    fields = extract_fields(norm_text, verified_aadhaar=aadhaar_no)
+
+    return {
+        "aadhaar_no": aadhaar_no,
+        "aadhaar_detected": aadhaar_detected,
+        "pan_no": pan_no,
+        "fields": fields,
+        "validation": validate_fields(fields)
+    }
+
+
+# -------------------------------
+# MAIN VERIFICATION FUNCTION
+# -------------------------------
+def verify_document(text, confidence, filename, profile=None, stages=None,
+                    submission=None):
+    """
+    profile:    ocr.profiles name / dict setting validation strictness.
+    stages:     optional utils.stage_cache.StageChain positioned at this
+                text's OCR output; the text / fields / report stages are
+                then served from the stage cache until their rules change.
+    submission: {"id", "image_hash"} of a live upload: checks (and records)
+                it in the duplicate index. Never cached.
+    """
+    profile = get_profile(profile)
+    run = stages or StageChain(None, None)
+
+    norm_text = run(
+        "text", NORMALIZER_VERSION, lambda: normalize_text(text),
+        normalizer_settings()
     )
+    found = run(
+        "fields",
+        (ID_RULES_VERSION, FIELD_RULES_VERSION, VALIDATION_RULES_VERSION),
+        lambda: find_fields(text, norm_text, profile),
+        profile["fuzzy_errors"]
+    )
+    report = run(
+        "report",
+        (SCORING_VERSION, TEMPLATES_VERSION),
+        lambda: build_report(norm_text, found, confidence, filename, profile),
+        confidence, filename, profile["name"], profile["min_ocr_confidence"]
+    )
+
+    if submission is not None:
+        add_duplicate_signals(report, found, filename, submission)
+    return report
+
+
+# -------------------------------
+# DUPLICATE / REUSED-ID SIGNALS
+# -------------------------------
+def add_duplicate_signals(report, found, filename, submission):
+    index = get_duplicate_index()
+    if index is None:
+        return
+
+    seen = index.check_and_add(
+        submission["id"],
+        filename,
+        ids=(found["aadhaar_no"], found["pan_no"]),
+        name=found["fields"].get("Name"),
+        phash=submission.get("image_hash")
+    )
+
+    report["ID Seen Before"] = seen["previous"] > 0
+    if seen["other_names"]:
+        # OCR misreads names too: flagged for a reviewer, integrity unchanged
+        report["ID Reuse Warning"] = (
+            f"ID number submitted before under a different name "
+            f"({seen['other_names']} earlier submission(s)) – check manually"
+        )
 
+    report["Near-Duplicate Image"] = bool(seen["near_images"])
+    if seen["near_images"]:
+        bits, earlier = seen["near_images"][0]
+        report["Near-Duplicate Of"] = f"{earlier} ({bits} bit(s) apart)"
+
+
+# -------------------------------
+# REPORT STAGE
+# -------------------------------
+def build_report(norm_text, found, confidence, filename, profile):
+
+    report = {}
+    report["Uploaded File Name"] = filename
+    report["Processing Profile"] = profile["name"]
+
+    classification = classify_document(norm_text)
+    report["Document Type"] = classification.get("document", "Unknown")
+    report["Document Category"] = classification.get("category", "Other")
+    report["Template Match Score"] = classification.get("score", 0)
+
+    aadhaar_no = found["aadhaar_no"]
+    pan_no = found["pan_no"]
+    aadhaar_detected = found["aadhaar_detected"]
     pan_detected = pan_no is not None
 
     if aadhaar_detected:
@@ -204,10 +310,9 @@ def verify_document(text, confidence, filename):
     report["PAN Detected"] = pan_detected
     report["PAN Number"] = pan_no if pan_detected else None
 
-    fields = extract_fields(norm_text, verified_aadhaar=aadhaar_no)
-    report["Extracted Fields"] = fields
+    report["Extracted Fields"] = found["fields"]
 
-    validation = validate_fields(fields)
+    validation = found["validation"]
     report["Field Validation"] = {
         k: {"valid": v[0], "reason": v[1]}
         for k, v in validation.items()
@@ -220,6 +325,9 @@ def verify_document(text, confidence, filename):
     report["Overall Integrity"] = (
         "REVIEW REQUIRED" if suspicious else "HIGH"
     )
+    if confidence < profile["min_ocr_confidence"]:
+        # strict profiles don't vouch for fields read from a poor scan
+        report["Overall Integrity"] = "REVIEW REQUIRED"
 
     # -------------------------------
     # SMART CONFIDENCE BOOST
@@ -0,0 +1,321 @@
+import argparse
+import csv
+import datetime
+import hashlib
+import hmac
+import json
+import os
+import secrets
+import sqlite3
+import sys
+import threading
+import time
+
+
+# -------------------------------
+# VERIFICATION RESULT STORE
+# -------------------------------
+# Every verify_document report the pipeline produces is appended to a
+# local SQLite database (OCR_RESULT_STORE, "" = off) for audit queries.
+# The columns audits filter on are indexed, so a query by document type,
+# integrity status, date range or ID hash reads only matching rows.
+#
+# ID numbers are never stored in clear: the id columns hold salted HMACs
+# (OCR_ID_SALT, or a random salt created with the database) and the
+# stored report JSON keeps only the last four digits.
+#
+#   python -m verification.result_store query --type "Aadhaar Card" --since 2026-01-01
+#   python -m verification.result_store export results.csv --integrity "REVIEW REQUIRED"
+
+ID_KEYS = ("Aadhaar Number", "PAN Number", "Voter ID", "DL Number")
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS meta (
+    key TEXT PRIMARY KEY,
+    value TEXT NOT NULL
+);
+CREATE TABLE IF NOT EXISTS results (
+    id INTEGER PRIMARY KEY,
+    doc_hash TEXT NOT NULL,
+    file_name TEXT,
+    page INTEGER,
+    card INTEGER,
+    doc_type TEXT,
+    integrity TEXT,
+    aadhaar_hash TEXT,
+    pan_hash TEXT,
+    ocr_confidence REAL,
+    verification_confidence REAL,
+    profile TEXT,
+    created_at REAL NOT NULL,
+    report TEXT NOT NULL
+);
+CREATE INDEX IF NOT EXISTS idx_results_time ON results (created_at);
+CREATE INDEX IF NOT EXISTS idx_results_type ON results (doc_type, created_at);
+CREATE INDEX IF NOT EXISTS idx_results_integrity ON results (integrity, created_at);
+CREATE INDEX IF NOT EXISTS idx_results_doc ON results (doc_hash);
+CREATE INDEX IF NOT EXISTS idx_results_aadhaar ON results (aadhaar_hash)
+    WHERE aadhaar_hash IS NOT NULL;
+CREATE INDEX IF NOT EXISTS idx_results_pan ON results (pan_hash)
+    WHERE pan_hash IS NOT NULL;
+"""
+
+COLUMNS = (
+    "id", "doc_hash", "file_name", "page", "card", "doc_type", "integrity",
+    "aadhaar_hash", "pan_hash", "ocr_confidence", "verification_confidence",
+    "profile", "created_at", "report"
+)
+
+
+def result_store_path():
+    return os.environ.get("OCR_RESULT_STORE", "verification_results.db")
+
+
+def mask_id(number):
+    number = str(number)
+    return "X" * max(len(number) - 4, 0) + number[-4:]
+
+
+def masked_report(report):
+    """Copy of a report with every ID number masked."""
+    report = dict(report)
+    for key in ID_KEYS:
+        if report.get(key):
+            report[key] = mask_id(report[key])
+    fields = report.get("Extracted Fields")
+    if isinstance(fields, dict):
+        report["Extracted Fields"] = {
+            k: mask_id(v) if k in ID_KEYS and v else v
+            for k, v in fields.items()
+        }
+    return report
+
+
+def salted_hash(salt, value):
+    """Salted HMAC of an ID number / name (spaces, case ignored); None passes through."""
+    if not value:
+        return None
+    value = "".join(str(value).split()).upper()
+    return hmac.new(salt, value.encode("utf-8"), hashlib.sha256).hexdigest()
+
+
+def _timestamp(value):
+    """Unix seconds from a number, datetime/date or ISO date string."""
+    if value is None or isinstance(value, (int, float)):
+        return value
+    if isinstance(value, str):
+        value = datetime.datetime.fromisoformat(value)
+    if not isinstance(value, datetime.datetime):
+        value = datetime.datetime.combine(value, datetime.time())
+    return value.timestamp()
+
+
+class ResultStore:
+
+    def __init__(self, path):
+        self.path = path
+        self._lock = threading.Lock()
+        # one connection shared by the document worker threads
+        self._db = sqlite3.connect(path, check_same_thread=False)
+        self._db.row_factory = sqlite3.Row
+        with self._lock, self._db:
+            self._db.execute("PRAGMA journal_mode=WAL")
+            self._db.executescript(SCHEMA)
+        self.salt = self._salt()
+
+    def _salt(self):
+        salt = os.environ.get("OCR_ID_SALT")
+        if salt:
+            return salt.encode("utf-8")
+        with self._lock, self._db:
+            self._db.execute(
+                "INSERT OR IGNORE INTO meta (key, value) VALUES ('id_salt', ?)",
+                (secrets.token_hex(16),)
+            )
+            row = self._db.execute("SELECT value FROM meta WHERE key = 'id_salt'").fetchone()
+        return row["value"].encode("utf-8")
+
+    def hash_id(self, number):
+        return salted_hash(self.salt, number)
+
+    # -------------------------------
+    # WRITE
+    # -------------------------------
+    def record(self, doc_hash, entries, profile=None, created_at=None):
+        """Stores the page entries (pipeline._page_entry) of one document."""
+        created_at = created_at or time.time()
+        rows = []
+        for entry in entries:
+            report = entry["report"]
+            rows.append((
+                doc_hash,
+                report.get("Uploaded File Name"),
+                entry.get("page"),
+                entry.get("card"),
+                report.get("Document Type"),
+                report.get("Overall Integrity"),
+                self.hash_id(report.get("Aadhaar Number")),
+                self.hash_id(report.get("PAN Number")),
+                report.get("OCR Confidence"),
+                report.get("Verification Confidence"),
+                profile or report.get("Processing Profile"),
+                created_at,
+                json.dumps(masked_report(report), default=str)
+            ))
+        with self._lock, self._db:
+            self._db.executemany(
+                "INSERT INTO results (doc_hash, file_name, page, card, doc_type, "
+                "integrity, aadhaar_hash, pan_hash, ocr_confidence, "
+                "verification_confidence, profile, created_at, report) "
+                "VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)",
+                rows
+            )
+
+    # -------------------------------
+    # READ
+    # -------------------------------
+    def _where(self, doc_type=None, integrity=None, since=None, until=None,
+               aadhaar=None, pan=None, id_hash=None, doc_hash=None):
+        clauses, params = [], []
+        if doc_type is not None:
+            clauses.append("doc_type = ?")
+            params.append(doc_type)
+        if integrity is not None:
+            clauses.append("integrity = ?")
+            params.append(integrity)
+        if since is not None:
+            clauses.append("created_at >= ?")
+            params.append(_timestamp(since))
+        if until is not None:
+            clauses.append("created_at < ?")
+            params.append(_timestamp(until))
+        if aadhaar is not None:
+            clauses.append("aadhaar_hash = ?")
+            params.append(self.hash_id(aadhaar))
+        if pan is not None:
+            clauses.append("pan_hash = ?")
+            params.append(self.hash_id(pan))
+        if id_hash is not None:
+            # either ID column; SQLite answers the OR from both indexes
+            clauses.append("(aadhaar_hash = ? OR pan_hash = ?)")
+            params += [id_hash, id_hash]
+        if doc_hash is not None:
+            clauses.append("doc_hash = ?")
+            params.append(doc_hash)
+        return (" WHERE " + " AND ".join(clauses)) if clauses else "", params
+
+    def query(self, limit=100, **filters):
+        """
+        Newest first. Filters: doc_type, integrity, since / until (unix
+        seconds, datetime or ISO date), aadhaar / pan (clear number, hashed
+        here), id_hash (either ID), doc_hash.
+        """
+        where, params = self._where(**filters)
+        sql = f"SELECT * FROM results{where} ORDER BY created_at DESC"
+        if limit:
+            sql += " LIMIT ?"
+            params.append(limit)
+        with self._lock:
+            rows = self._db.execute(sql, params).fetchall()
+        return [self._row(r) for r in rows]
+
+    def count(self, **filters):
+        where, params = self._where(**filters)
+        with self._lock:
+            return self._db.execute(f"SELECT COUNT(*) FROM results{where}", params).fetchone()[0]
+
+    def _row(self, row):
+        row = dict(row)
+        row["report"] = json.loads(row["report"])
+        return row
+
+    def export(self, path, batch=5000, **filters):
+        """
+        Streams matching rows (oldest first) to .csv or .jsonl without
+        loading them all; returns the row count.
+        """
+        where, params = self._where(**filters)
+        # own connection: a long export doesn't hold the writers' lock
+        db = sqlite3.connect(self.path)
+        cursor = db.execute(f"SELECT * FROM results{where} ORDER BY created_at", params)
+        jsonl = path.endswith(".jsonl")
+        written = 0
+        try:
+            with open(path, "w", newline="", encoding="utf-8") as f:
+                writer = None if jsonl else csv.writer(f)
+                if writer:
+                    writer.writerow(COLUMNS)
+                while True:
+                    rows = cursor.fetchmany(batch)
+                    if not rows:
+                        break
+                    for row in rows:
+                        if jsonl:
+                            record = dict(zip(COLUMNS, row))
+                            record["report"] = json.loads(record["report"])
+                            f.write(json.dumps(record) + "\n")
+                        else:
+                            writer.writerow(row)
+                    written += len(rows)
+        finally:
+            db.close()
+        return written
+
+    def close(self):
+        with self._lock:
+            self._db.close()
+
+
+_store = None
+_store_lock = threading.Lock()
+
+
+def get_result_store():
+    """Process-wide ResultStore, or None when OCR_RESULT_STORE is empty."""
+    global _store
+    path = result_store_path()
+    if not path:
+        return None
+    with _store_lock:
+        if _store is None or _store.path != path:
+            _store = ResultStore(path)
+        return _store
+
+
+# -------------------------------
+# CLI
+# -------------------------------
+def main(argv):
+    parser = argparse.ArgumentParser(prog="python -m verification.result_store")
+    parser.add_argument("command", choices=["query", "count", "export"])
+    parser.add_argument("output", nargs="?", help="export file (.csv / .jsonl)")
+    parser.add_argument("--type", dest="doc_type")
+    parser.add_argument("--integrity")
+    parser.add_argument("--since")
+    parser.add_argument("--until")
+    parser.add_argument("--aadhaar")
+    parser.add_argument("--pan")
+    parser.add_argument("--limit", type=int, default=20)
+    args = parser.parse_args(argv[1:])
+
+    store = get_result_store()
+    if store is None:
+        sys.exit("OCR_RESULT_STORE is empty")
+
+    filters = {
+        k: v for k, v in vars(args).items()
+        if k in ("doc_type", "integrity", "since", "until", "aadhaar", "pan") and v
+    }
+    if args.command == "count":
+        print(store.count(**filters))
+    elif args.command == "export":
+        if not args.output:
+            sys.exit("export needs an output file")
+        print(f"{store.export(args.output, **filters)} rows → {args.output}")
+    else:
+        for row in store.query(limit=args.limit, **filters):
+            print(json.dumps(row, default=str))
+
+
+if __name__ == "__main__":
+    main(sys.argv)
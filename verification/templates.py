@@ -1,3 +1,6 @@
+# bump when templates / classifier.py scoring change (see utils/stage_cache.py)
+TEMPLATES_VERSION = 1
+
 DOCUMENT_TEMPLATES = {
 
     "Aadhaar Card": {
@@ -34,3 +34,11 @@ def verhoeff_check(num: str) -> bool:
     for i, digit in enumerate(reversed(num)):
         c = _d_table[c][_p_table[i % 8][int(digit)]]
     return c == 0
+
+
+def verhoeff_generate(num: str) -> str:
+    """Return the Verhoeff check digit to append to num"""
+    c = 0
+    for i, digit in enumerate(reversed(num)):
+        c = _d_table[c][_p_table[(i + 1) % 8][int(digit)]]
+    return str(_inv_table[c])